@@ -1,47 +1,271 @@
-import subprocess
-import os
+import time
 
+# Taken before the other imports so the reported time to first check includes start-up
+STARTED = time.perf_counter()
 
-def run_test_module(module_name):
+import argparse
+import sys
+import traceback
+from contextlib import nullcontext, redirect_stderr, redirect_stdout
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+from utils.browser import close_pool
+from utils.config import (
+    BASE_URL, RUNNER_WORKERS, CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES, GRID_NODES, EVENTS_OUTPUT, FAIL_FAST,
+    LINK_MAX_FAILURES, TIME_BUDGET, FORCE_REFRESH, DAEMON_ADDRESS, HTTP_ARCHIVE_MODE,
+)
+from utils.crawler import Frontier, crawl, read_url_list, read_sitemap
+from utils.daemon import ConnectionWriter, load_authkey
+from utils.grid import parse_node, start_local_nodes, stop_local_nodes, use_grid
+from utils.incremental import set_force_refresh
+from utils.replay import stop_archive, use_archive
+from utils.reporter import flush_report, export_excel, new_run
+from utils.runner import first_check_started, reset_first_check, run_checks
+from utils.snapshot import clear_snapshots
+from utils import events, policy, tracing
+
+
+# Test modules and the entry function each one exposes
+TEST_MODULES = [
+    ("tests.test_h1_tag", "test_h1_tag"),
+    ("tests.test_html_sequence", "test_html_sequence"),
+    ("tests.test_image_alt", "test_image_alt_attributes"),
+    ("tests.test_url_status_404", "test_404"),
+    ("tests.test_currency_filtering", "test_currency_filtering"),
+    ("tests.test_script_data_scrape", "scrape_script_data"),
+    ("tests.test_page_performance", "test_page_performance"),
+]
+
+# Checks run on every page in crawl mode
+CRAWL_MODULES = [
+    ("tests.test_h1_tag", "test_h1_tag"),
+    ("tests.test_html_sequence", "test_html_sequence"),
+    ("tests.test_image_alt", "test_image_alt_attributes"),
+    ("tests.test_url_status_404", "test_404"),
+    ("tests.test_script_data_scrape", "scrape_script_data"),
+]
+
+
+def print_summary(results, elapsed, first_check=None):
+    """Print one line per check followed by the total wall-clock time."""
+    print("\nSummary:")
+    for result in results:
+        name = result["module"]
+        if result["args"]:
+            name = f"{name} {result['args'][0]}"
+        timings = result["timings"]
+        line = (
+            f"  {name:<35} {result['status']:<6} {result['duration']:>8.2f}s"
+            f"  load {timings['Page Load (s)']:.2f}s  wait {timings['Wait (s)']:.2f}s"
+            f"  http {timings['HTTP Time (s)']:.2f}s  {timings['WebDriver Commands']} commands"
+        )
+        if result["error"]:
+            line += f"  {result['error']}"
+        print(line)
+    if first_check is not None:
+        print(f"Time to first check: {first_check:.2f}s")
+    print(f"Total time: {elapsed:.2f}s")
+
+
+def main(argv=None, started=STARTED, warm=False):
     """
-    Run a test module using `python -m`.
+    Main function to call all the test modules.
 
     Args:
-        module_name (str): The module name to run (e.g., 'tests.test_h1_tag').
-
-    Returns:
-        None
+        argv (list): Command-line arguments; defaults to sys.argv.
+        started (float): perf_counter() time the run was requested, for time to first check.
+        warm (bool): Running inside `--serve`; browsers are kept open for the next run.
     """
-    try:
-        print(f"\nRunning {module_name}...")
-        subprocess.run(["python", "-m", module_name], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error while running {module_name}: {e}")
-    except Exception as e:
-        print(f"Unexpected error: {e}")
+    parser = argparse.ArgumentParser(description="Run the Selenium test suite.")
+    parser.add_argument(
+        "-w", "--workers", type=int,
+        help=f"Number of checks to run concurrently (default: {RUNNER_WORKERS}, or the grid's capacity).",
+    )
+    parser.add_argument(
+        "--export", action="store_true",
+        help="Export the results store to the Excel report after the run.",
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE",
+        help="Write a Chrome trace-format JSON of every span (open in chrome://tracing or Perfetto).",
+    )
+    parser.add_argument(
+        "--force-refresh", action="store_true", default=FORCE_REFRESH,
+        help="Re-run every check, even on pages whose checked content has not changed.",
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="Stay running with browsers warm and serve runs sent by `python -m utils.daemon ARGS...`.",
+    )
+    archive_group = parser.add_argument_group("record and replay").add_mutually_exclusive_group()
+    archive_group.add_argument(
+        "--record", dest="archive_mode", action="store_const", const="record", default=HTTP_ARCHIVE_MODE,
+        help="Fetch pages and links live and save every response to the HTTP archive.",
+    )
+    archive_group.add_argument(
+        "--replay", dest="archive_mode", action="store_const", const="replay",
+        help="Serve pages and links only from the HTTP archive, without touching the network.",
+    )
+    stream_group = parser.add_argument_group("streaming and early abort")
+    stream_group.add_argument(
+        "--events", metavar="FILE", default=EVENTS_OUTPUT,
+        help="Stream results as JSON lines to FILE, or to stdout with '-' (progress then goes to stderr).",
+    )
+    stream_group.add_argument(
+        "--fail-fast", action="store_true", default=FAIL_FAST,
+        help="Stop starting new checks after the first failure and exit with status 1.",
+    )
+    stream_group.add_argument(
+        "--max-link-failures", type=int, metavar="N", default=LINK_MAX_FAILURES,
+        help="Stop probing a page's links after N broken ones.",
+    )
+    stream_group.add_argument(
+        "--time-budget", type=float, metavar="SECONDS", default=TIME_BUDGET,
+        help="Skip the remaining work once the run has taken this long, and exit with status 1.",
+    )
+    grid_group = parser.add_argument_group("distributed execution")
+    grid_group.add_argument(
+        "--node", action="append", default=[], metavar="URL[=CAPACITY]",
+        help="Run browsers on a Selenium Grid node or chromedriver at URL (repeatable; adds to GRID_NODES).",
+    )
+    grid_group.add_argument(
+        "--local-nodes", type=int, default=0, metavar="N",
+        help="Start N local chromedriver processes and spread the browsers across them.",
+    )
+    crawl_group = parser.add_argument_group("crawl mode")
+    crawl_group.add_argument("--urls", metavar="FILE", help="Audit the URLs listed in FILE, one per line.")
+    crawl_group.add_argument("--sitemap", metavar="FILE", help="Audit the URLs listed in a sitemap XML file.")
+    crawl_group.add_argument(
+        "--crawl", action="store_true",
+        help="Follow same-domain links from the seed pages (BASE_URL if no list or sitemap is given).",
+    )
+    crawl_group.add_argument(
+        "--max-depth", type=int, default=CRAWL_MAX_DEPTH,
+        help=f"Link hops to follow when crawling (default: {CRAWL_MAX_DEPTH}).",
+    )
+    crawl_group.add_argument(
+        "--max-pages", type=int, default=CRAWL_MAX_PAGES,
+        help=f"Maximum number of pages to audit (default: {CRAWL_MAX_PAGES}).",
+    )
+    args = parser.parse_args(argv)
 
+    if args.serve:
+        if warm:
+            parser.error("--serve cannot be sent to a running daemon")
+        return serve()
 
-def main():
+    # Per-run state is reset so a long-lived process starts every run clean
+    run_id = new_run()
+    clear_snapshots()
+    reset_first_check()
+    if args.trace:
+        tracing.enable_trace()
+    set_force_refresh(args.force_refresh)
+    use_archive(args.archive_mode)
+
+    nodes = list(GRID_NODES) + [parse_node(spec) for spec in args.node]
+    nodes += [parse_node(url) for url in start_local_nodes(args.local_nodes)] if args.local_nodes else []
+    use_grid(nodes)
+    if args.workers is None:
+        args.workers = sum(capacity for _, capacity in nodes) or RUNNER_WORKERS
+
+    policy.configure(
+        fail_fast=args.fail_fast, link_max_failures=args.max_link_failures, time_budget=args.time_budget,
+    )
+    if args.events:
+        events.open_events(args.events)
+    # With events on stdout, progress messages go to stderr so the stream stays parseable
+    with redirect_stdout(sys.stderr) if args.events == "-" else nullcontext():
+        print("Starting test execution...\n")
+        start = time.perf_counter()
+        policy.start()
+        events.emit("run_start", run_id=run_id, workers=args.workers)
+        try:
+            if args.urls or args.sitemap or args.crawl:
+                seeds = []
+                if args.urls:
+                    seeds += read_url_list(args.urls)
+                if args.sitemap:
+                    seeds += read_sitemap(args.sitemap)
+                frontier = Frontier(seeds or [BASE_URL], max_depth=args.max_depth, max_pages=args.max_pages)
+                results = crawl(frontier, CRAWL_MODULES, workers=args.workers, discover=args.crawl)
+            else:
+                results = run_checks(TEST_MODULES, workers=args.workers)
+        finally:
+            # Browsers on this run's own local nodes cannot outlive them
+            if not warm or args.local_nodes:
+                close_pool()
+                stop_local_nodes()
+            # Write every check's results to the store in one go
+            flush_report()
+            stop_archive()
+
+        if args.export:
+            export_excel()
+        if args.trace:
+            tracing.write_trace(args.trace)
+
+        elapsed = time.perf_counter() - start
+        first_check = first_check_started()
+        first_check = None if first_check is None else first_check - started
+        events.emit(
+            "run_end", run_id=run_id, duration=round(elapsed, 3), stopped=policy.stopped(),
+            time_to_first_check=None if first_check is None else round(first_check, 3),
+            checks={status: sum(r["status"] == status for r in results) for status in ("ok", "error", "skipped")},
+        )
+        print_summary(results, elapsed, first_check)
+        print("\nAll tests completed.")
+    events.close_events()
+
+    # A run cut short by fail-fast or the time budget is reported as failed
+    if policy.stopped():
+        sys.exit(1)
+
+
+def serve(address=DAEMON_ADDRESS, authkey=None):
     """
-    Main function to call all the test modules.
+    Keep the interpreter, its imports and a pool of warm browsers alive, and run
+    the arguments each client sends (see utils/daemon.py), one run at a time.
+
+    Only clients presenting the secret in DAEMON_AUTHKEY_FILE, created on the
+    first start, are accepted.
     """
-    print("Starting test execution...\n")
-
-    # List of test modules to run
-    test_modules = [
-        "tests.test_h1_tag",
-        "tests.test_html_sequence",
-        "tests.test_image_alt",
-        "tests.test_url_status_404",
-        "tests.test_currency_filtering",
-        "tests.test_script_data_scrape",
-    ]
-
-    # Run each test module
-    for module in test_modules:
-        run_test_module(module)
-
-    print("\nAll tests completed.")
+    with Listener(address, authkey=authkey or load_authkey(create=True)) as listener:
+        print(f"Serving runs on {address[0]}:{address[1]}; stop with Ctrl+C.")
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError) as e:
+                    # A client with the wrong key, or one that hung up, must not stop the daemon
+                    print(f"Rejected a connection: {e}")
+                    continue
+                with conn:
+                    argv = conn.recv()
+                    if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+                        conn.send(("stderr", "Expected a list of app.py arguments.\n"))
+                        conn.send(("exit", 2))
+                        continue
+                    started = time.perf_counter()
+                    # The client gets the run's output as it is printed
+                    with redirect_stdout(ConnectionWriter(conn, "stdout")), \
+                            redirect_stderr(ConnectionWriter(conn, "stderr")):
+                        try:
+                            main(argv, started=started, warm=True)
+                            code = 0
+                        except SystemExit as e:
+                            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+                        except Exception:
+                            traceback.print_exc()
+                            code = 1
+                    try:
+                        conn.send(("exit", code))
+                    except OSError:
+                        pass
+        except KeyboardInterrupt:
+            print("Daemon stopped.")
+        finally:
+            close_pool()
 
 
 if __name__ == "__main__":
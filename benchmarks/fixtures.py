@@ -0,0 +1,88 @@
+import json
+from utils.snapshot import PageSnapshot
+from tests.test_currency_filtering import CURRENCY_CASES
+
+
+# Element counts of the synthetic fixture pages
+FIXTURE_SIZES = {
+    "small": {"links": 20, "images": 10, "headers": 6, "prices": 4},
+    "medium": {"links": 300, "images": 150, "headers": 60, "prices": 50},
+    "large": {"links": 3000, "images": 1500, "headers": 600, "prices": 1000},
+}
+
+# Every this-many-th link points at a missing page
+MISSING_LINK_EVERY = 25
+# Every this-many-th image has no alt attribute
+MISSING_ALT_EVERY = 10
+
+SCRIPT_DATA = {
+    "config": {"SiteUrl": "https://fixture.local", "SiteName": "Fixture Site", "Currency": "USD"},
+    "userInfo": {"Browser": "Chrome", "CountryCode": "ES", "IP": "127.0.0.1"},
+    "pageData": {"Listing": {"Id": 8347060, "Amenities": ["wifi", "pool"], "Rates": {"nightly": 120}}},
+}
+
+
+def _link(base_url, i):
+    kind = "missing" if i % MISSING_LINK_EVERY == 0 else "link"
+    return f"{base_url}/{kind}/{i}"
+
+
+def build_fixture(size, base_url):
+    """
+    Generate a synthetic property page and the snapshot a browser would capture from it.
+
+    Args:
+        size (str): One of FIXTURE_SIZES.
+        base_url (str): Origin of the fixture server (e.g. 'http://127.0.0.1:8000').
+
+    Returns:
+        str: The page HTML.
+        PageSnapshot: The matching snapshot, for benchmarking checks without a browser.
+    """
+    counts = FIXTURE_SIZES[size]
+    headers = [f"h{1 + min(i, 5)}" if i < 6 else f"h{2 + i % 5}" for i in range(counts["headers"])]
+    images = [
+        {"src": f"{base_url}/img/{i}.png", "alt": None if i % MISSING_ALT_EVERY == 0 else f"Photo {i}"}
+        for i in range(counts["images"])
+    ]
+    links = [_link(base_url, i) for i in range(counts["links"])]
+    symbols = {case["currency_code"]: case["currency_symbol"] for case in CURRENCY_CASES}
+
+    script_data = f"var ScriptData = {json.dumps(SCRIPT_DATA)};"
+    campaign = "var Campaign = { CampaignId: '12345' };"
+    currency_script = f"""
+const symbols = {json.dumps(symbols, ensure_ascii=False)};
+document.getElementById("js-currency-sort-footer").addEventListener("click", () => {{
+    document.getElementById("js-currency-list").style.display = "block";
+}});
+document.querySelectorAll("li[data-currency-country]").forEach(option => option.addEventListener("click", () => {{
+    const symbol = symbols[option.dataset.currencyCountry];
+    // Update prices in batches to mimic a progressive re-render
+    const prices = Array.from(document.querySelectorAll(".js-price-value"));
+    prices.forEach((price, i) => setTimeout(() => {{ price.textContent = symbol + " 120"; }}, i % 5));
+}}));
+"""
+
+    parts = ["<!DOCTYPE html><html><head><title>Fixture</title>"]
+    parts.append(f"<script>{script_data}</script><script>{campaign}</script></head><body>")
+    parts.extend(f"<{tag}>Heading {i}</{tag}>" for i, tag in enumerate(headers))
+    parts.extend(
+        f'<img src="{image["src"]}"' + (f' alt="{image["alt"]}">' if image["alt"] else ">")
+        for image in images
+    )
+    parts.extend(f'<a href="{link}">Link {i}</a>' for i, link in enumerate(links))
+    parts.extend('<span class="js-price-value">$ 120</span>' for _ in range(counts["prices"]))
+    parts.append('<div id="js-currency-sort-footer">Currency</div><ul id="js-currency-list" style="display:none">')
+    parts.extend(f'<li data-currency-country="{code}">{code}</li>' for code in symbols)
+    parts.append(f"</ul><script>{currency_script}</script></body></html>")
+    html = "".join(parts)
+
+    snapshot = PageSnapshot(
+        url=f"{base_url}/fixture/{size}",
+        page_source=html,
+        headers=headers,
+        images=images,
+        links=links,
+        scripts=[script_data, campaign, currency_script],
+    )
+    return html, snapshot
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from functools import partial
+from benchmarks.fixtures import FIXTURE_SIZES
+from benchmarks.server import RECORDED_DIR, start_server
+from utils import reporter
+from utils.browser import close_pool
+from utils.link_checker import check_urls
+from utils.snapshot import load_page
+from tests.test_h1_tag import check_h1_tag
+from tests.test_html_sequence import validate_header_sequence
+from tests.test_image_alt import validate_image_alt_attributes
+from tests.test_url_status_404 import get_all_links, validate_url_status
+from tests.test_currency_filtering import test_currency_filtering
+from tests.test_script_data_scrape import extract_script_data
+
+
+BENCHMARK_RESULTS = "./output/benchmarks.jsonl"
+# A benchmark this much slower than the previous commit's run is flagged
+REGRESSION_THRESHOLD = 0.20
+
+
+def git_commit():
+    """Return the short hash of the checked-out commit, or 'unknown'."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(function, repeat):
+    """Call a function `repeat` times and return the median duration in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def bench_reporter(rows):
+    """Record a batch of result rows, flush them to a scratch store and export it."""
+    with tempfile.TemporaryDirectory() as scratch:
+        store = os.path.join(scratch, "results.sqlite")
+        reporter.record_result(
+            [{"Test Case": "Benchmark", "Status": "Passed", "Page URL": "http://fixture", "Comments": "x" * 80}] * rows,
+            sheet_name="Benchmark",
+        )
+        reporter.flush_report(store)
+        reporter.export_excel(os.path.join(scratch, "results.xlsx"), path=store)
+
+
+def run_benchmarks(sizes, repeat, browser):
+    """
+    Time every check hot path against the fixture pages.
+
+    Returns:
+        list: One {"benchmark", "size", "seconds"} dictionary per measurement.
+    """
+    server, base_url, snapshots = start_server()
+    results = []
+
+    def add(name, size, seconds):
+        results.append({"benchmark": name, "size": size, "seconds": round(seconds, 6)})
+        print(f"  {name:<32} {size:<8} {seconds * 1000:>10.2f} ms")
+
+    try:
+        for size in sizes:
+            snapshot = snapshots[size]
+            add("check_h1_tag", size, measure(partial(check_h1_tag, snapshot), repeat))
+            add("validate_header_sequence", size, measure(partial(validate_header_sequence, snapshot), repeat))
+            add("validate_image_alt_attributes", size, measure(partial(validate_image_alt_attributes, snapshot), repeat))
+            add("get_all_links", size, measure(partial(get_all_links, snapshot), repeat))
+            add("extract_script_data", size, measure(partial(extract_script_data, snapshot), repeat))
+            # The link cache is bypassed so every run probes every link
+            links = get_all_links(snapshot)
+            add("test_404", size, measure(partial(check_urls, links, validate_url_status), repeat))
+            add("reporter", size, measure(partial(bench_reporter, FIXTURE_SIZES[size]["links"]), repeat))
+            add("static_snapshot", size, measure(partial(load_page, f"{base_url}/fixture/{size}", "static"), repeat))
+
+            if browser:
+                url = f"{base_url}/fixture/{size}"
+
+                add("snapshot_capture", size, measure(partial(load_page, url, "browser"), repeat))
+                add("test_currency_filtering", size, measure(partial(test_currency_filtering, url), repeat))
+                # Drop the currency rows instead of writing them to the real results store
+                with tempfile.TemporaryDirectory() as scratch:
+                    reporter.flush_report(os.path.join(scratch, "discard.sqlite"))
+    finally:
+        server.shutdown()
+        close_pool()
+    return results
+
+
+def load_previous(commit, path=BENCHMARK_RESULTS):
+    """Return the latest stored run made at a different commit, if any."""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            run = json.loads(line)
+            if run["commit"] != commit:
+                previous = run
+    return previous
+
+
+def compare(results, previous):
+    """Print the change of every benchmark against a previous run."""
+    baseline = {(r["benchmark"], r["size"]): r["seconds"] for r in previous["results"]}
+    print(f"\nCompared with {previous['commit']} ({previous['timestamp']}):")
+    for result in results:
+        before = baseline.get((result["benchmark"], result["size"]))
+        if not before:
+            continue
+        change = (result["seconds"] - before) / before
+        flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+        print(f"  {result['benchmark']:<32} {result['size']:<8} {change:>+8.1%}{flag}")
+
+
+def record_fixture(url, name):
+    """Save the rendered source of a live page so the fixture server can replay it."""
+    os.makedirs(RECORDED_DIR, exist_ok=True)
+    path = os.path.join(RECORDED_DIR, f"{name}.html")
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(load_page(url, engine="browser", page_source=True).page_source)
+    finally:
+        close_pool()
+    print(f"Recorded {url} to {path}")
+
+
+def main():
+    """Run the benchmark suite from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the checks against local fixture pages.")
+    parser.add_argument("--sizes", default=",".join(FIXTURE_SIZES), help="Comma-separated fixture sizes to run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark; the median is reported.")
+    parser.add_argument("--no-browser", action="store_true", help="Skip benchmarks that need Chrome.")
+    parser.add_argument("--output", default=BENCHMARK_RESULTS, help="JSON lines file results are appended to.")
+    parser.add_argument("--record", nargs=2, metavar=("URL", "NAME"), help="Record a live page as a fixture and exit.")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixture(*args.record)
+        return
+
+    commit = git_commit()
+    print(f"Running benchmarks at commit {commit}...")
+    results = run_benchmarks(args.sizes.split(","), args.repeat, browser=not args.no_browser)
+
+    previous = load_previous(commit, args.output)
+    run = {"commit": commit, "timestamp": datetime.now().isoformat(timespec="seconds"), "results": results}
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+    print(f"\nResults appended to {args.output}")
+
+    if previous:
+        compare(results, previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from benchmarks.fixtures import FIXTURE_SIZES, build_fixture
+
+
+# Pages recorded from live sites (see `python -m benchmarks.run --record`)
+RECORDED_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# 1x1 transparent PNG served for every image
+PIXEL = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63000100000500010d0a2db40000000049454e44ae426082"
+)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves fixture pages, link targets and images for the benchmarks."""
+
+    protocol_version = "HTTP/1.1"
+    pages = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, send_body):
+        status, content_type, body = self._resolve()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _resolve(self):
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/fixture/") and path[len("/fixture/"):] in self.pages:
+            return 200, "text/html; charset=utf-8", self.pages[path[len("/fixture/"):]].encode("utf-8")
+        if path.startswith("/recorded/"):
+            name = os.path.basename(path)
+            file_path = os.path.join(RECORDED_DIR, f"{name}.html")
+            if os.path.exists(file_path):
+                with open(file_path, "rb") as f:
+                    return 200, "text/html; charset=utf-8", f.read()
+        if path.startswith("/link/"):
+            return 200, "text/html", b"<html><body>ok</body></html>"
+        if path.startswith("/img/"):
+            return 200, "image/png", PIXEL
+        return 404, "text/html", b"<html><body>Not Found</body></html>"
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+
+def start_server(port=0):
+    """
+    Start the fixture server on a background thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call `shutdown()` when done.
+        str: Its base URL.
+        dict: Maps each fixture size to its PageSnapshot.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    snapshots = {}
+    for size in FIXTURE_SIZES:
+        FixtureHandler.pages[size], snapshots[size] = build_fixture(size, base_url)
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url, snapshots
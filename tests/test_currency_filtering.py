@@ -1,11 +1,13 @@
-import pandas as pd
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from selenium.common.exceptions import TimeoutException
-from utils.browser import get_driver
-from utils.reporter import save_report
-from utils.config import BASE_URL, WAIT_TIME
+from utils import tracing
+from utils.browser import borrow_driver
+from utils.registry import rule, run_rules
+from utils.snapshot import collect_elements
+from utils.reporter import record_result, flush_report
+from utils.waits import wait_until_all
+from utils.config import BASE_URL, CURRENCY_WORKERS, CURRENCY_URL_PARAM, CURRENCY_COOKIE
 
 
 CURRENCY_MAP = {
@@ -19,6 +21,60 @@ CURRENCY_MAP = {
     "BD": "BDT",
 }
 
+# Prices are rendered by the site's own scripts; no images, fonts or media are needed
+RESOURCES_NEEDED = ()
+
+PRICE_ELEMENTS = (".js-price-value", ["innerText"])
+
+CURRENCY_CASES = [
+    {"currency_code": "US", "currency_symbol": "$"},
+    {"currency_code": "CA", "currency_symbol": "$"},
+    {"currency_code": "BE", "currency_symbol": "€"},
+    {"currency_code": "IE", "currency_symbol": "£"},
+    {"currency_code": "AU", "currency_symbol": "$"},
+    {"currency_code": "SG", "currency_symbol": "$"},
+    {"currency_code": "AE", "currency_symbol": "د.إ."},
+    {"currency_code": "BD", "currency_symbol": "৳"},
+]
+
+
+# Read live from the browser after every currency switch, so never reused
+@rule("Currency Prices", {"prices": PRICE_ELEMENTS}, reuse=False)
+def price_texts(snapshot):
+    """Return the text of every price element in the snapshot."""
+    return [element["innerText"] or "" for element in snapshot.get("prices")]
+
+
+def price_mismatches(prices, currency_symbol):
+    """Return a mismatch message for every price text without the currency symbol."""
+    errors = []
+    for price_text in prices:
+        # print(price_text)
+        if currency_symbol not in price_text:
+            errors.append(f"Currency mismatch in element: {price_text}")
+    return errors
+
+
+def verify_prices(driver, country_code, currency_symbol):
+    """
+    Wait for the prices to show a currency symbol and list the ones that don't.
+
+    Returns:
+        list: A mismatch message for every price element without the symbol.
+    """
+    # Wait until every price shows the new symbol; any that never update are reported below
+    try:
+        # Timed per currency, so one currency that never updates does not slow the others
+        wait_until_all(
+            driver, PRICE_ELEMENTS[0], "text_contains", currency_symbol, key=f"currency_prices:{country_code}",
+        )
+    except TimeoutException:
+        pass
+
+    # Validate all price elements on the page, reading their text in one round-trip
+    prices = run_rules(collect_elements(driver, ["Currency Prices"]), ["Currency Prices"])["Currency Prices"]
+    return price_mismatches(prices, currency_symbol)
+
 
 def change_currency_and_verify_all(driver, country_code, currency_symbol):
     """
@@ -33,6 +89,9 @@ def change_currency_and_verify_all(driver, country_code, currency_symbol):
         bool: True if all elements updated correctly, False otherwise.
         list: A list of error messages for elements that failed.
     """
+    # Imported here, like the driver modules in utils.browser, so importing the check does not load webdriver
+    from selenium.webdriver.common.by import By
+
     errors = []
 
     try:
@@ -42,24 +101,13 @@ def change_currency_and_verify_all(driver, country_code, currency_symbol):
         driver.execute_script("arguments[0].click();", dropdown)
 
         # Select the currency option
-        option = WebDriverWait(driver, WAIT_TIME).until(
-            EC.presence_of_element_located((By.XPATH, f"//li[@data-currency-country='{country_code}']"))
-        )
+        option_selector = f"li[data-currency-country='{country_code}']"
+        wait_until_all(driver, option_selector, key="currency_option")
+        option = driver.find_element(By.CSS_SELECTOR, option_selector)
         driver.execute_script("arguments[0].scrollIntoView(true);", option)
         driver.execute_script("arguments[0].click();", option)
 
-        # Wait for the prices to update
-        WebDriverWait(driver, WAIT_TIME).until(
-            EC.text_to_be_present_in_element((By.CLASS_NAME, "js-price-value"), currency_symbol)
-        )
-
-        # Validate all price elements on the page
-        price_elements = driver.find_elements(By.CLASS_NAME, "js-price-value")
-        for element in price_elements:
-            price_text = element.text
-            # print(price_text)
-            if currency_symbol not in price_text:
-                errors.append(f"Currency mismatch in element: {price_text}")
+        errors.extend(verify_prices(driver, country_code, currency_symbol))
 
     except TimeoutException:
         errors.append(f"Timeout: Failed to load or update currency for {CURRENCY_MAP[country_code]} ({currency_symbol}).")
@@ -67,31 +115,63 @@ def change_currency_and_verify_all(driver, country_code, currency_symbol):
     return len(errors) == 0, errors  # True if no errors, otherwise False and error list
 
 
-def test_currency_filtering():
-    """Test for currency filtering and property price updates across all price elements."""
-    driver = get_driver()
-    test_cases = [
-        {"currency_code": "US", "currency_symbol": "$"},
-        {"currency_code": "CA", "currency_symbol": "$"},
-        {"currency_code": "BE", "currency_symbol": "€"},
-        {"currency_code": "IE", "currency_symbol": "£"},
-        {"currency_code": "AU", "currency_symbol": "$"},
-        {"currency_code": "SG", "currency_symbol": "$"},
-        {"currency_code": "AE", "currency_symbol": "د.إ."},
-        {"currency_code": "BD", "currency_symbol": "৳"},
-    ]
+def load_with_currency(driver, url, country_code):
+    """Load the page with the currency preselected through a URL parameter or cookie."""
+    if CURRENCY_COOKIE:
+        # Cookies can only be set for the domain currently loaded
+        driver.get(url)
+        driver.add_cookie({"name": CURRENCY_COOKIE, "value": CURRENCY_MAP[country_code]})
+    if CURRENCY_URL_PARAM:
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query) + [(CURRENCY_URL_PARAM, CURRENCY_MAP[country_code])]
+        url = urlunsplit(parts._replace(query=urlencode(query)))
+    driver.get(url)
 
-    failed_currencies = []  # Collect currencies that failed
-    try:
-        driver.get(BASE_URL)
 
-        for case in test_cases:
-            print(f"Testing currency: {CURRENCY_MAP[case['currency_code']]} ({case['currency_symbol']})")
-            success, errors = change_currency_and_verify_all(driver, case["currency_code"], case["currency_symbol"])
-            if not success:
-                failed_currencies.append(f"{CURRENCY_MAP[case['currency_code']]} ({case['currency_symbol']}): {', '.join(errors)}")
-    finally:
-        driver.quit()
+def run_currency_cases(url, cases):
+    """
+    Verify a group of currency cases in one browser session.
+
+    Returns:
+        dict: Maps each failed country code to its error messages.
+    """
+    failures = {}
+    with borrow_driver(needs=RESOURCES_NEEDED) as driver:
+        direct = CURRENCY_URL_PARAM or CURRENCY_COOKIE
+        if not direct:
+            driver.get(url)
+
+        for case in cases:
+            code, symbol = case["currency_code"], case["currency_symbol"]
+            print(f"Testing currency: {CURRENCY_MAP[code]} ({symbol})")
+            if direct:
+                load_with_currency(driver, url, code)
+                errors = verify_prices(driver, code, symbol)
+            else:
+                _, errors = change_currency_and_verify_all(driver, code, symbol)
+            if errors:
+                failures[code] = errors
+    return failures
+
+
+def test_currency_filtering(url=BASE_URL, workers=CURRENCY_WORKERS):
+    """Test for currency filtering and property price updates across all price elements."""
+    # Split the cases round-robin across independent browser sessions
+    workers = max(1, min(workers, len(CURRENCY_CASES)))
+    groups = [CURRENCY_CASES[i::workers] for i in range(workers)]
+
+    failures = {}
+    run_group = tracing.bind_check(lambda group: run_currency_cases(url, group))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="currency") as executor:
+        for group_failures in executor.map(run_group, groups):
+            failures.update(group_failures)
+
+    # Collect currencies that failed, in the order they are declared
+    failed_currencies = [
+        f"{CURRENCY_MAP[case['currency_code']]} ({case['currency_symbol']}): {', '.join(failures[case['currency_code']])}"
+        for case in CURRENCY_CASES
+        if case["currency_code"] in failures
+    ]
 
     # Determine overall status and comments
     if failed_currencies:
@@ -101,20 +181,18 @@ def test_currency_filtering():
         status = "Passed"
         comments = "All currencies updated successfully for all price elements."
 
-    # Create a single-row result
-    result = [
+    # Add the single-row result to the report
+    record_result(
         {
             "Test Case": "Currency Filtering Test",
             "Status": status,
-            "Page URL": BASE_URL,
+            "Page URL": url,
             "Comments": comments,
-        }
-    ]
-
-    # Save the single-row result to the report
-    results_df = pd.DataFrame(result)
-    save_report(results_df, sheet_name="Currency Filtering Test")
+        },
+        sheet_name="Currency Filtering Test",
+    )
 
 
 if __name__ == "__main__":
     test_currency_filtering()
+    flush_report()
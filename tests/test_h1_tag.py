@@ -1,60 +1,39 @@
-import pandas as pd
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from utils.browser import get_driver
-from utils.reporter import initialize_report, save_report
-from utils.config import BASE_URL, WAIT_TIME
-
-
-def check_h1_tag(driver):
-    """Check for H1 tag on the given page and ensure only one exists."""
-    try:
-        driver.get(BASE_URL)
-
-        # Wait for up to WAIT_TIME seconds to find the H1 tag
-        WebDriverWait(driver, WAIT_TIME).until(
-            EC.presence_of_element_located((By.TAG_NAME, "h1"))
-        )
-        h1_tags = driver.find_elements(By.TAG_NAME, "h1")
-
-        # Check the number of H1 tags and set status and comments
-        if len(h1_tags) == 1:
-            return "Passed", "H1 tag exists."
-        elif len(h1_tags) == 0:
-            return "Fail", "No H1 tag found."
-        else:
-            return "Fail", f"Multiple H1 tags found: {len(h1_tags)}"
-    except TimeoutException:
-        return "Fail", "Timeout: Unable to find H1 tag."
-
-
-def test_h1_tag():
+from utils.registry import rule, run_rules
+from utils.snapshot import HEADER_ELEMENTS, get_snapshot
+from utils.reporter import record_result, flush_report
+from utils.config import BASE_URL
+
+
+@rule("H1 Tag Test", {"headers": HEADER_ELEMENTS})
+def check_h1_tag(snapshot):
+    """Check for H1 tag on the given page snapshot and ensure only one exists."""
+    h1_count = snapshot.headers.count("h1")
+
+    # Check the number of H1 tags and set status and comments
+    if h1_count == 1:
+        status, comments = "Passed", "H1 tag exists."
+    elif h1_count == 0:
+        status, comments = "Fail", "No H1 tag found."
+    else:
+        status, comments = "Fail", f"Multiple H1 tags found: {h1_count}"
+
+    return {
+        "Test Case": "H1 Tag Test",
+        "Status": status,
+        "Page URL": snapshot.url,
+        "Comments": comments,
+    }
+
+
+def test_h1_tag(url=BASE_URL):
     """Test for H1 tag on the specified page."""
-    results = initialize_report()
-    driver = get_driver()
-
-    try:
-        print(f"Testing H1 tag on: {BASE_URL}")
-        status, comments = check_h1_tag(driver)
-
-        # Add result to the excel file for the current page
-        new_row = pd.DataFrame(
-            [
-                {
-                    "Test Case": "H1 Tag Test",
-                    "Status": status,
-                    "Page URL": BASE_URL,
-                    "Comments": comments,
-                }
-            ]
-        )
-        results = pd.concat([results, new_row], ignore_index=True)
-    finally:
-        driver.quit()
-        save_report(results, sheet_name="H1 Tag Test")
+    print(f"Testing H1 tag on: {url}")
+    snapshot = get_snapshot(url)
+
+    # Add result to the report for the current page; reused if the headers are unchanged
+    record_result(run_rules(snapshot, ["H1 Tag Test"])["H1 Tag Test"], sheet_name="H1 Tag Test")
 
 
 if __name__ == "__main__":
     test_h1_tag()
+    flush_report()
@@ -1,74 +1,57 @@
-import pandas as pd
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from utils.browser import get_driver
-from utils.reporter import save_report
-from utils.config import BASE_URL, WAIT_TIME
-
-
-def validate_image_alt_attributes(driver):
-    """Validate the alt attributes of all images on the page."""
-    missing_alt_images = []  # To collect image srcs with missing alt attributes
-
-    try:
-        driver.get(BASE_URL)
-
-        # Wait for up to WAIT_TIME seconds to find any image tag
-        WebDriverWait(driver, WAIT_TIME).until(
-            EC.presence_of_element_located((By.TAG_NAME, "img"))
-        )
-        images = driver.find_elements(By.TAG_NAME, "img")
-
-        # Check alt attributes for each image
-        for img in images:
-            src = img.get_attribute("src")
-            alt = img.get_attribute("alt")
-
-            # Collect src if alt attribute is missing
-            if not alt:
-                missing_alt_images.append(src)
-
-    except TimeoutException:
+from utils.failure_log import FailureLog
+from utils.registry import rule, run_rules
+from utils.snapshot import IMAGE_ELEMENTS, get_snapshot
+from utils.reporter import record_result, flush_report
+from utils.config import BASE_URL
+
+
+@rule("Image Alt Attribute Test", {"images": IMAGE_ELEMENTS})
+def validate_image_alt_attributes(snapshot):
+    """Validate the alt attributes of all images on the page snapshot."""
+    # Captured snapshots keep only the images without alt text; the count covers all of them
+    if not snapshot.counts.get("images", len(snapshot.images)):
         return {
             "Test Case": "Image Alt Attribute Test",
             "Status": "Fail",
-            "Page URL": BASE_URL,
+            "Page URL": snapshot.url,
             "Comments": "No images found on the page.",
         }
 
+    # Collect image srcs with missing alt attributes; past FAILURE_DETAILS_MAX they are spilled to a file
+    with FailureLog(f"Image Alt Attribute Test {snapshot.url}") as missing_alt_images:
+        for image in snapshot.images:
+            if not image["alt"]:
+                missing_alt_images.add(image["src"])
+
     # Determine the overall status and comments
-    if not missing_alt_images:
+    if not missing_alt_images.count:
         return {
             "Test Case": "Image Alt Attribute Test",
             "Status": "Passed",
-            "Page URL": BASE_URL,
+            "Page URL": snapshot.url,
             "Comments": "All images have alt attributes.",
         }
     else:
         return {
             "Test Case": "Image Alt Attribute Test",
             "Status": "Fail",
-            "Page URL": BASE_URL,
-            "Comments": f"Missing alt attributes for images: {', '.join(missing_alt_images)}",
+            "Page URL": snapshot.url,
+            "Comments": f"Missing alt attributes for images: {missing_alt_images.summary()}",
         }
 
 
-def test_image_alt_attributes():
+def test_image_alt_attributes(url=BASE_URL):
     """Test for image alt attributes on the specified page."""
-    driver = get_driver()
+    print(f"Testing image alt attributes on: {url}")
+    snapshot = get_snapshot(url)
 
-    try:
-        print(f"Testing image alt attributes on: {BASE_URL}")
-        result = validate_image_alt_attributes(driver)  # Single result dictionary
-    finally:
-        driver.quit()
+    # Single result dictionary; reused if the page's images are unchanged
+    result = run_rules(snapshot, ["Image Alt Attribute Test"])["Image Alt Attribute Test"]
 
-    # Save the single-row result to the main report
-    results_df = pd.DataFrame([result])  # Wrap the dictionary in a list
-    save_report(results_df, sheet_name="Image Alt Attribute Test")
+    # Add the single-row result to the main report
+    record_result(result, sheet_name="Image Alt Attribute Test")
 
 
 if __name__ == "__main__":
     test_image_alt_attributes()
+    flush_report()
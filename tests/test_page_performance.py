@@ -0,0 +1,130 @@
+from selenium.common.exceptions import TimeoutException
+from utils.browser import ALL_RESOURCES, borrow_driver, cache_disabled, read_performance
+from utils.snapshot import get_snapshot
+from utils.reporter import record_result, flush_report
+from utils.config import BASE_URL, PERFORMANCE_BUDGETS, PERFORMANCE_COLD_CACHE, PERFORMANCE_SLOWEST_RESOURCES
+
+
+# The page is measured as visitors get it, so nothing is blocked
+RESOURCES_NEEDED = ALL_RESOURCES
+
+
+def measure_page(url):
+    """
+    Load a page in the browser with every resource allowed and read its timing entries.
+
+    Only used when the shared snapshot load was not measured (see PERFORMANCE_SHARED_LOAD).
+    """
+    with borrow_driver(needs=RESOURCES_NEEDED) as driver:
+        with cache_disabled(driver, PERFORMANCE_COLD_CACHE):
+            driver.get(url)
+            return read_performance(driver)
+
+
+def _ms(value):
+    return None if value is None else round(value)
+
+
+def performance_metrics(performance):
+    """
+    Turn the timing entries of a page load into numeric report columns.
+
+    Args:
+        performance (dict): As returned by `utils.browser.read_performance`.
+
+    Returns:
+        dict: Times in milliseconds from navigation start, the transferred
+        kilobytes and the request count (the document plus its resources).
+    """
+    resources = performance["resources"]
+    return {
+        "TTFB (ms)": _ms(performance["ttfb"]),
+        "DOM Content Loaded (ms)": _ms(performance["dom_content_loaded"]),
+        "Load (ms)": _ms(performance["load"]),
+        "LCP (ms)": _ms(performance["lcp"]),
+        "Transfer (KB)": round(performance["transfer_bytes"] / 1024, 1),
+        "Requests": len(resources) + 1,
+        "Slowest Resource (ms)": _ms(max((entry["duration"] for entry in resources), default=None)),
+    }
+
+
+def over_budget(metrics, budgets=PERFORMANCE_BUDGETS):
+    """List every metric above its budget, e.g. 'LCP (ms) 3120 > 2500'."""
+    return [
+        f"{column} {metrics[column]} > {limit}"
+        for column, limit in budgets.items()
+        if limit is not None and metrics.get(column) is not None and metrics[column] > limit
+    ]
+
+
+def evaluate_performance(url, performance):
+    """Check a page load against PERFORMANCE_BUDGETS and return its result row."""
+    metrics = performance_metrics(performance)
+    exceeded = over_budget(metrics)
+
+    # Name the slowest resources so a failure points at its likely cause
+    slowest = sorted(performance["resources"], key=lambda entry: entry["duration"], reverse=True)
+    slowest = ", ".join(f"{entry['name']} ({_ms(entry['duration'])} ms)" for entry in slowest[:PERFORMANCE_SLOWEST_RESOURCES])
+
+    if exceeded:
+        status = "Fail"
+        comments = f"Over budget: {', '.join(exceeded)}."
+    else:
+        status = "Passed"
+        comments = "All metrics within budget."
+    if slowest:
+        comments += f" Slowest resources: {slowest}"
+
+    return {
+        "Test Case": "Page Performance Test",
+        "Status": status,
+        "Page URL": url,
+        "Comments": comments,
+        **metrics,
+    }
+
+
+def resource_rows(url, performance):
+    """One row of timing per resource the page loaded."""
+    return [
+        {
+            "Page URL": url,
+            "Resource URL": entry["name"],
+            "Type": entry["type"],
+            "Start (ms)": _ms(entry["start"]),
+            "Duration (ms)": _ms(entry["duration"]),
+            # Zero for cached responses and cross-origin ones without a Timing-Allow-Origin header
+            "Transfer (KB)": round(entry["transfer_bytes"] / 1024, 1),
+        }
+        for entry in performance["resources"]
+    ]
+
+
+def test_page_performance(url=BASE_URL):
+    """Test the load performance of the specified page against the configured budgets."""
+    print(f"Testing page performance on: {url}")
+    snapshot = get_snapshot(url)
+
+    # Reuse the snapshot's own load when it was measured; static and fast-profile loads are not
+    try:
+        performance = snapshot.performance or measure_page(url)
+    except TimeoutException:
+        record_result(
+            {
+                "Test Case": "Page Performance Test",
+                "Status": "Fail",
+                "Page URL": url,
+                "Comments": "The page did not finish loading.",
+            },
+            sheet_name="Page Performance Test",
+        )
+        return
+
+    # Timings change on every load, so the result is never reused from a previous run
+    record_result(evaluate_performance(url, performance), sheet_name="Page Performance Test")
+    record_result(resource_rows(url, performance), sheet_name="Resource Timing")
+
+
+if __name__ == "__main__":
+    test_page_performance()
+    flush_report()
@@ -1,25 +1,31 @@
-import os
-import pandas as pd
-import re
-import json
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from utils.browser import get_driver
-from utils.config import BASE_URL, WAIT_TIME
+from utils.js_object import find_assignments, flatten
+from utils.registry import rule, run_rules
+from utils.snapshot import SCRIPT_ELEMENTS, get_snapshot
+from utils.reporter import record_result, flush_report
+from utils.config import BASE_URL
 
 
-def preprocess_js_object(js_object):
-    """Convert a JavaScript object string to valid JSON."""
-    js_object = re.sub(r"([{,])\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:", r'\1"\2":', js_object)
-    js_object = js_object.replace("null", "null").replace("true", "true").replace("false", "false")
-    return js_object
+# Report columns taken from well-known ScriptData fields
+SCRIPT_DATA_FIELDS = {
+    "SiteURL": ("config", "SiteUrl"),
+    "SiteName": ("config", "SiteName"),
+    "Browser": ("userInfo", "Browser"),
+    "CountryCode": ("userInfo", "CountryCode"),
+    "IP": ("userInfo", "IP"),
+}
 
 
-def extract_script_data(driver):
-    """Extract the required data from the <script> tags."""
+@rule("Script Data", {"scripts": SCRIPT_ELEMENTS})
+def extract_script_data(snapshot):
+    """
+    Extract ScriptData and CampaignId from the page snapshot in a single scan.
+
+    Returns:
+        dict: The page URL and named report columns followed by every ScriptData
+        field, flattened into dotted keys (e.g. 'config.SiteUrl').
+    """
     data = {
+        "Page URL": snapshot.url,
         "SiteURL": None,
         "CampaignID": None,
         "SiteName": None,
@@ -29,90 +35,35 @@ def extract_script_data(driver):
     }
 
     try:
-        driver.get(BASE_URL)
-        WebDriverWait(driver, WAIT_TIME).until(
-            EC.presence_of_all_elements_located((By.TAG_NAME, "script"))
-        )
-
-        scripts = driver.find_elements(By.TAG_NAME, "script")
-        for script in scripts:
-            script_content = script.get_attribute("innerHTML")
+        # The assignments live in inline scripts; saved snapshots without them fall back to the page source
+        source = "\n".join(snapshot.scripts) or snapshot.page_source
+        found = find_assignments(source, ["ScriptData", "CampaignId"])
 
-            # Extract CampaignID
-            if "CampaignId" in script_content:
-                match = re.search(r"CampaignId\s*:\s*['\"](.*?)['\"]", script_content)
-                if match:
-                    data["CampaignID"] = match.group(1)
+        if found.get("CampaignId") is not None:
+            data["CampaignID"] = str(found["CampaignId"])
 
-            # Extract ScriptData
-            if "var ScriptData =" in script_content:
-                match = re.search(r"var ScriptData = ({.*?});", script_content, re.DOTALL)
-                if match:
-                    script_data = match.group(1)
-                    script_data = preprocess_js_object(script_data)
-                    script_data_dict = json.loads(script_data)
+        script_data_dict = found.get("ScriptData")
+        if isinstance(script_data_dict, dict):
+            # Extract specific fields
+            for column, (section, field) in SCRIPT_DATA_FIELDS.items():
+                data[column] = (script_data_dict.get(section) or {}).get(field)
+            data.update(flatten(script_data_dict))
 
-                    # Extract specific fields
-                    data["SiteURL"] = script_data_dict["config"]["SiteUrl"]
-                    data["SiteName"] = script_data_dict["config"]["SiteName"]
-                    data["Browser"] = script_data_dict["userInfo"]["Browser"]
-                    data["CountryCode"] = script_data_dict["userInfo"]["CountryCode"]
-                    data["IP"] = script_data_dict["userInfo"]["IP"]
-
-    except TimeoutException:
-        print(f"Timeout: Unable to extract script data after {WAIT_TIME} seconds.")
     except Exception as e:
         print(f"Error while extracting script data: {str(e)}")
 
     return data
 
 
-def save_data_to_report(data, file_path, sheet_name):
-    """
-    Append data to an existing sheet in an Excel file, or create a new sheet if it doesn't exist.
-    
-    Args:
-        data (list): Data to be saved.
-        file_path (str): Path to the Excel file.
-        sheet_name (str): Name of the sheet to save the data.
-    """
-    new_df = pd.DataFrame(data)
-
-    try:
-        # Check if the file exists
-        if os.path.exists(file_path):
-            # Read the existing Excel file
-            with pd.ExcelWriter(file_path, engine="openpyxl", mode="a", if_sheet_exists="overlay") as writer:
-                # Check if the sheet already exists
-                existing_data = pd.read_excel(file_path, sheet_name=sheet_name)
-                # Combine existing data with new data
-                combined_df = pd.concat([existing_data, new_df], ignore_index=True)
-                # Write the combined data back to the sheet
-                combined_df.to_excel(writer, index=False, sheet_name=sheet_name)
-        else:
-            # If the file doesn't exist, create it and write the data
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-                new_df.to_excel(writer, index=False, sheet_name=sheet_name)
-        print(f"Data appended to {file_path} in sheet '{sheet_name}'.")
-    except Exception as e:
-        print(f"Error while saving data: {str(e)}")
-
-
-def scrape_script_data():
+def scrape_script_data(url=BASE_URL):
     """Scrape data from <script> tags and save to the main report."""
-    driver = get_driver()
-    results = []
-
-    try:
-        print(f"Scraping script data from: {BASE_URL}")
-        data = extract_script_data(driver)
-        results.append(data)
-    finally:
-        driver.quit()
+    print(f"Scraping script data from: {url}")
+    snapshot = get_snapshot(url)
 
-    # Save data to the main report file
-    save_data_to_report(results, "./output/test_results.xlsx", "Script Data")
+    # Add data to the main report; reused if the page's scripts are unchanged
+    record_result(run_rules(snapshot, ["Script Data"])["Script Data"], sheet_name="Script Data")
 
 
 if __name__ == "__main__":
     scrape_script_data()
+    flush_report()
@@ -1,10 +1,13 @@
-import pandas as pd
-import requests
+from urllib.parse import urlsplit
 from requests.exceptions import RequestException
-from selenium.webdriver.common.by import By
-from utils.browser import get_driver
-from utils.reporter import save_report
-from utils.config import BASE_URL, WAIT_TIME
+from utils import events, policy, tracing
+from utils.link_cache import LinkCache, normalize_url
+from utils.failure_log import FailureLog
+from utils.link_checker import HostBreaker, HostUnavailable, iter_check_urls, probe_url
+from utils.registry import rule, run_rules
+from utils.snapshot import LINK_ELEMENTS, get_snapshot
+from utils.reporter import record_result, flush_report
+from utils.config import BASE_URL, LINK_CACHE_ENABLED, LINK_CACHE_TTL
 
 
 # Dictionary of common HTTP status codes and their meanings
@@ -16,73 +19,142 @@ HTTP_STATUS_DESCRIPTIONS = {
 }
 
 
-def get_all_links(driver):
-    """Retrieve all valid links from the page."""
-    links = driver.find_elements(By.TAG_NAME, "a")
-    valid_links = set()
-    for link in links:
-        href = link.get_attribute("href")
-        if href:
-            valid_links.add(href)
-    return valid_links
+# Only web links can be probed; mailto:, tel:, javascript: and similar links are skipped
+PROBED_SCHEMES = ("http", "https")
 
 
-def validate_url_status(url):
-    """Validate the status code of a URL for 404 and broken links."""
+def canonical_link(href):
+    """Return the canonical form of a web link, or None for links that are not probed."""
     try:
-        response = requests.head(url, allow_redirects=True, timeout=5)
-        status_code = response.status_code
-        if status_code == 404:
-            return False, f"{url} (404: {HTTP_STATUS_DESCRIPTIONS[404]})"
-        elif status_code in HTTP_STATUS_DESCRIPTIONS:
-            return False, f"{url} ({status_code}: {HTTP_STATUS_DESCRIPTIONS[status_code]})"
-        else:
-            return True, None  # Pass if status code is not 404 or broken
+        if urlsplit(href).scheme.lower() not in PROBED_SCHEMES:
+            return None
+        return normalize_url(href)
+    except ValueError:
+        return href  # Malformed, e.g. a bad port; probed as-is so it is reported
+
+
+def get_all_links(snapshot):
+    """Retrieve all web links from the page snapshot, each spelling of a URL once."""
+    links = {canonical_link(href) for href in snapshot.links if href}
+    links.discard(None)
+    return links
+
+
+def validate_url_status(url, cache=None, breaker=None):
+    """
+    Validate the status code of a URL for 404 and broken links.
+
+    Args:
+        url (str): The URL to validate.
+        cache (LinkCache): Optional cache consulted before probing and updated after.
+        breaker (HostBreaker): Optional breaker that skips hosts which keep failing.
+
+    Returns:
+        bool: True if the link is healthy, False otherwise.
+        str: An error message for broken links, None otherwise.
+    """
+    # Fresh passing results are reused; stale or failing links are probed again
+    if cache is not None and cache.lookup(url) is not None:
+        return True, None
+
+    try:
+        response = probe_url(url, breaker=breaker)
+    except HostUnavailable as e:
+        return False, f"{url} (Not checked: {str(e)})."
     except RequestException as e:
+        if cache is not None:
+            cache.store(url, None, None, ok=False)
         return False, f"{url} (Request error: {str(e)})."
 
+    status_code = response.status_code
+    if status_code == 404:
+        success, error_message = False, f"{url} (404: {HTTP_STATUS_DESCRIPTIONS[404]})"
+    elif status_code in HTTP_STATUS_DESCRIPTIONS:
+        success, error_message = False, f"{url} ({status_code}: {HTTP_STATUS_DESCRIPTIONS[status_code]})"
+    else:
+        success, error_message = True, None  # Pass if status code is not 404 or broken
+
+    if cache is not None:
+        cache.store(url, status_code, response.url, ok=success)
+    return success, error_message
 
-def test_404():
-    """Test for 404 errors and broken links on all links of the specified page."""
-    driver = get_driver()
-    failed_links = []  # Collect failed links for comments
 
-    try:
-        print(f"Fetching links from: {BASE_URL}")
-        driver.get(BASE_URL)
-        links = get_all_links(driver)
+def check_links(links):
+    """Probe every link and return the 404 test's status and comments."""
+    skipped = 0
+    check = tracing.current_check()
 
-        for link in links:
-            # print(f"Checking link: {link}")
-            success, error_message = validate_url_status(link)
-            if not success:
-                failed_links.append(error_message)
+    cache = LinkCache() if LINK_CACHE_ENABLED else None
+    # A dead host costs LINK_HOST_MAX_FAILURES timeouts, not one per link
+    breaker = HostBreaker()
+
+    def validate(link):
+        success, error_message = validate_url_status(link, cache, breaker)
+        if not success:
+            # Stream each broken link as soon as it is found
+            events.emit("link_failed", check=check, url=link, error=error_message)
+        return success, error_message
 
+    # Collect failed links for comments; past FAILURE_DETAILS_MAX they are spilled to a file
+    failed_links = FailureLog(check or "404 Test")
+    try:
+        # Links are checked in parallel with a per-host concurrency limit, until
+        # LINK_MAX_FAILURES broken links are found or the run is stopped
+        results = iter_check_urls(
+            links, validate, is_failure=lambda result: not result[0], max_failures=policy.link_max_failures(),
+        )
+        for link, result in results:
+            # print(f"Checking link: {link}")
+            if result is None:
+                skipped += 1
+            elif not result[0]:
+                failed_links.add(result[1])
     finally:
-        driver.quit()
+        failed_links.close()
+        if cache is not None:
+            cache.close()
 
     # Determine overall test status and comments
-    if failed_links:
+    if failed_links.count:
         status = "Fail"
-        comments = f"Broken or 404 links: {', \n'.join(failed_links)}"
+        comments = "Broken or 404 links: " + failed_links.summary(", \n")
+    elif skipped:
+        status = "Incomplete"
+        comments = "No broken links found among the links checked."
     else:
         status = "Passed"
         comments = "All links are accessible, no 404 errors found."
+    if skipped:
+        comments = f"{comments}\n{skipped} links not checked (stopped early)."
+    if cache is not None:
+        comments = f"{comments}\n{cache.summary()}"
+    return status, comments
+
+
+# Link health depends on other servers, so only a passing result is reused, and only
+# for as long as the link cache would trust a status
+@rule("404 Test", {"links": LINK_ELEMENTS}, reuse_failures=False, max_age=LINK_CACHE_TTL)
+def check_page_links(snapshot):
+    """Probe every link of the page snapshot and return the 404 test's row."""
+    status, comments = check_links(get_all_links(snapshot))
+    return {
+        "Test Case": "404 Test",
+        "Status": status,
+        "Page URL": snapshot.url,
+        "Comments": comments,
+    }
+
+
+def test_404(url=BASE_URL):
+    """Test for 404 errors and broken links on all links of the specified page."""
+    print(f"Fetching links from: {url}")
+    snapshot = get_snapshot(url)
+    result = run_rules(snapshot, ["404 Test"])["404 Test"]
 
-    # Create a single-row result
-    result = [
-        {
-            "Test Case": "404 Test",
-            "Status": status,
-            "Page URL": BASE_URL,
-            "Comments": comments,
-        }
-    ]
-
-    # Save the single-row result to the report
-    results_df = pd.DataFrame(result)
-    save_report(results_df, sheet_name="404 Test")
+    # Add the single-row result to the report
+    record_result(result, sheet_name="404 Test")
 
 
 if __name__ == "__main__":
     test_404()
+    flush_report()
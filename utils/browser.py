@@ -1,13 +1,545 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from utils.config import WEBDRIVER_PATH
+import atexit
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from urllib3.exceptions import HTTPError
+from selenium.common.exceptions import WebDriverException
+from utils import tracing
+from utils.config import (
+    WEBDRIVER_PATH, DRIVER_POOL_SIZE, DRIVER_MAX_USES, BROWSER_PROFILE, BROWSER_PROFILE_TEMPLATE,
+    ELEMENT_CHUNK_SIZE, PERFORMANCE_LOAD_TIMEOUT,
+)
 
 
-def get_driver():
-    """Set up and return the Chrome WebDriver."""
+# URL patterns blocked in the fast profile unless a check declares it needs them
+BLOCKABLE_RESOURCES = {
+    "images": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "fonts": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.m3u8*"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*connect.facebook.net*", "*hotjar.com*", "*clarity.ms*",
+    ],
+}
+ALL_RESOURCES = tuple(BLOCKABLE_RESOURCES)
+
+# Errors raised by a browser session that has died, locally or on an unreachable remote node
+DRIVER_ERRORS = (WebDriverException, HTTPError, OSError)
+
+
+# Reads the requested properties (falling back to attributes) of the elements matched
+# by each selector, from index `start` for at most `limit` elements per selector, and
+# returns them with each selector's total match count in one JSON payload
+BULK_EXTRACT_SCRIPT = """
+const [specs, start, limit] = arguments;
+const read = (el, name) => {
+    const value = name in el ? el[name] : el.getAttribute(name);
+    if (value === undefined || value === null) return null;
+    // SVG attributes such as <a href> are exposed as animated value objects
+    if (typeof value === "object") return "baseVal" in value ? value.baseVal : String(value);
+    return value;
+};
+const result = {};
+for (const [key, selector, names] of specs) {
+    const elements = document.querySelectorAll(selector);
+    const rows = [];
+    for (let i = start; i < Math.min(elements.length, start + limit); i++) {
+        const row = {};
+        for (const name of names) row[name] = read(elements[i], name);
+        rows.push(row);
+    }
+    result[key] = {total: elements.length, rows};
+}
+return result;
+"""
+
+# Waits for the load event, then resolves with the page's Navigation Timing, Largest
+# Contentful Paint and Resource Timing entries (times in ms from navigation start).
+# LCP entries are only exposed to a buffered PerformanceObserver, so `settle` ms are
+# given for its callback before the entries are read.
+PERFORMANCE_SCRIPT = """
+const [settle, done] = arguments;
+let lcp = null;
+const collect = () => {
+    const nav = performance.getEntriesByType("navigation")[0];
+    const resources = performance.getEntriesByType("resource").map((entry) => ({
+        name: entry.name,
+        type: entry.initiatorType,
+        start: entry.startTime,
+        duration: entry.duration,
+        transfer_bytes: entry.transferSize || 0,
+    }));
+    done({
+        ttfb: nav ? nav.responseStart : null,
+        dom_content_loaded: nav ? nav.domContentLoadedEventEnd : null,
+        load: nav ? nav.loadEventEnd : null,
+        lcp: lcp,
+        transfer_bytes: resources.reduce((total, entry) => total + entry.transfer_bytes, nav ? nav.transferSize || 0 : 0),
+        resources: resources,
+    });
+};
+const observe = () => {
+    try {
+        const observer = new PerformanceObserver((list) => {
+            const entries = list.getEntries();
+            if (entries.length) lcp = entries[entries.length - 1].startTime;
+        });
+        observer.observe({type: "largest-contentful-paint", buffered: true});
+    } catch (e) {
+        // Browsers without LCP support report it as null
+    }
+    setTimeout(collect, settle);
+};
+if (document.readyState === "complete") observe();
+// loadEventEnd is only set once every load handler has returned
+else window.addEventListener("load", () => setTimeout(observe, 0), {once: true});
+"""
+
+
+def _instrument(driver):
+    """Route every WebDriver command through the tracer."""
+    execute = driver.execute
+
+    def traced_execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            category = "page_load" if driver_command == "get" else "webdriver"
+            tracing.record(driver_command, category, start, time.perf_counter())
+
+    driver.execute = traced_execute
+    return driver
+
+
+# Called with every new browser, local or remote, to route its requests (see utils.replay)
+_interceptor = None
+
+
+def set_interceptor(install):
+    """
+    Have browsers started from now on intercept their network requests, or not (None).
+
+    Args:
+        install (callable): Called with each new driver, which has WebDriver BiDi
+            enabled, to register its request handlers.
+    """
+    global _interceptor
+    if install is not _interceptor:
+        # Pooled browsers still route through the previous interceptor
+        close_pool()
+    _interceptor = install
+
+
+def _intercept(driver):
+    """Apply the current interceptor to a freshly started driver."""
+    if _interceptor is not None:
+        try:
+            _interceptor(driver)
+        except Exception:
+            quit_driver(driver)
+            raise
+    return driver
+
+
+# The selenium webdriver modules are imported by the functions below that start a browser,
+# so runs served entirely by the static engine never load them
+
+
+def _fast_options():
+    """Chrome options for the headless, low-overhead profile."""
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+
     options = ChromeOptions()
-    # options.add_argument("--headless")  # Optional: Run browser in background
-    options.add_argument("--start-maximized")  # Open browser in maximized mode
+    options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    # Return from driver.get at DOMContentLoaded; checks wait for what they need themselves
+    options.page_load_strategy = "eager"
+    return options
+
+
+_profile_lock = threading.Lock()
+
+
+def _prepare_user_data_dir():
+    """Copy the pre-warmed profile template into a private user-data dir for one browser."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+
+    template = os.path.abspath(BROWSER_PROFILE_TEMPLATE)
+    with _profile_lock:
+        if not os.path.isdir(template):
+            # Launch once so Chrome's first-run setup is paid only when the template is created
+            options = _fast_options()
+            options.add_argument(f"--user-data-dir={template}")
+            webdriver.Chrome(service=ChromeService(WEBDRIVER_PATH), options=options).quit()
+
+    # Chrome locks a user-data dir, so every browser gets its own copy
+    user_data_dir = tempfile.mkdtemp(prefix="chrome-profile-")
+    shutil.copytree(
+        template, user_data_dir, dirs_exist_ok=True,
+        ignore=shutil.ignore_patterns("Singleton*", "*.lock", "Crash*"),
+    )
+    return user_data_dir
+
+
+def get_driver(profile=BROWSER_PROFILE):
+    """
+    Set up and return the Chrome WebDriver.
+
+    Args:
+        profile (str): 'fast' for a headless browser with heavy resources blocked,
+            'full' for a regular maximized browser.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+    if profile == "full":
+        options = ChromeOptions()
+        options.add_argument("--start-maximized")  # Open browser in maximized mode
+        user_data_dir = None
+    else:
+        options = _fast_options()
+        user_data_dir = _prepare_user_data_dir()
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+    # Request interception runs over WebDriver BiDi
+    options.enable_bidi = _interceptor is not None
+
     service = ChromeService(WEBDRIVER_PATH)
-    return webdriver.Chrome(service=service, options=options)
+    with tracing.span("get_driver", "driver_start"):
+        driver = webdriver.Chrome(service=service, options=options)
+    driver.profile = profile
+    driver.user_data_dir = user_data_dir
+    driver.blocked_resources = ()
+    return _intercept(_instrument(driver))
+
+
+def get_remote_driver(command_executor, profile=BROWSER_PROFILE):
+    """
+    Start a Chrome session on a Selenium Grid node or a standalone chromedriver.
+
+    Args:
+        command_executor (str): The node's URL (e.g. 'http://grid-host:4444').
+        profile (str): As for `get_driver`. The pre-warmed profile template lives
+            on this machine, so remote sessions start from a fresh profile.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+
+    if profile == "full":
+        options = ChromeOptions()
+        options.add_argument("--start-maximized")
+    else:
+        options = _fast_options()
+
+    options.enable_bidi = _interceptor is not None
+
+    # The Chromium connection adds the vendor commands CDP resource blocking needs
+    connection = ChromiumRemoteConnection(command_executor, vendor_prefix="goog", browser_name="chrome")
+    with tracing.span("get_driver", "driver_start"):
+        driver = webdriver.Remote(command_executor=connection, options=options)
+    driver.profile = profile
+    driver.user_data_dir = None
+    driver.blocked_resources = ()
+    return _intercept(_instrument(driver))
+
+
+def _cdp(driver, command, params):
+    """
+    Send a Chrome DevTools command. Goes through the generic command endpoint, which
+    local and remote Chrome drivers both register, unlike `execute_cdp_cmd`.
+    """
+    return driver.execute("executeCdpCommand", {"cmd": command, "params": params})["value"]
+
+
+def block_resources(driver, needs=()):
+    """
+    Block every resource category a check does not need (fast profile only).
+
+    Args:
+        driver: Selenium WebDriver instance created by `get_driver`.
+        needs (iterable): Categories of BLOCKABLE_RESOURCES the check needs loaded.
+    """
+    if getattr(driver, "profile", None) != "fast":
+        return
+    blocked = tuple(category for category in ALL_RESOURCES if category not in needs)
+    if blocked == driver.blocked_resources:
+        return
+    patterns = [pattern for category in blocked for pattern in BLOCKABLE_RESOURCES[category]]
+    _cdp(driver, "Network.enable", {})
+    _cdp(driver, "Network.setBlockedURLs", {"urls": patterns})
+    driver.blocked_resources = blocked
+
+
+def extract_many(driver, specs, chunk_size=ELEMENT_CHUNK_SIZE):
+    """
+    Extract properties of several element groups, in a single WebDriver round-trip
+    unless a group has more than `chunk_size` elements.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        specs (dict): Maps a result key to a (css_selector, [property names]) pair.
+        chunk_size (int): Most elements of one group transferred per round-trip.
+
+    Returns:
+        dict: Maps each key to a list of {property: value} dictionaries.
+    """
+    result = {key: [] for key in specs}
+    for key, total, rows in iter_extract(driver, specs, chunk_size):
+        result[key].extend(rows)
+    return result
+
+
+def iter_extract(driver, specs, chunk_size=ELEMENT_CHUNK_SIZE):
+    """
+    Yield the element groups of `specs` as (key, total, rows) chunks, so a caller
+    can keep only what it needs of each chunk (see PageSnapshot.from_chunks).
+
+    The first chunk of every group comes from one round-trip; a group with more
+    than `chunk_size` elements is then read a chunk at a time by `iter_elements`.
+    `total` is the number of elements the group's selector matched.
+    """
+    payload = [[key, selector, list(names)] for key, (selector, names) in specs.items()]
+    first = driver.execute_script(BULK_EXTRACT_SCRIPT, payload, 0, chunk_size)
+
+    for key, selector, names in payload:
+        group = first.pop(key)
+        yield key, group["total"], group["rows"]
+        if group["total"] > len(group["rows"]):
+            for chunk in iter_elements(driver, selector, names, chunk_size, start=len(group["rows"])):
+                yield key, group["total"], chunk
+
+
+def iter_elements(driver, selector, names, chunk_size=ELEMENT_CHUNK_SIZE, start=0):
+    """
+    Yield the given properties of the elements matching a CSS selector, one chunk at a time.
+
+    Each chunk is a list of at most `chunk_size` {property: value} dictionaries,
+    read with one `execute_script` slice of `querySelectorAll`, so a caller that
+    processes and drops each chunk keeps memory flat however large the page is.
+    """
+    while True:
+        page = driver.execute_script(BULK_EXTRACT_SCRIPT, [["elements", selector, list(names)]], start, chunk_size)
+        rows = page["elements"]["rows"]
+        if rows:
+            yield rows
+        start += len(rows)
+        if not rows or start >= page["elements"]["total"]:
+            return
+
+
+def read_performance(driver, settle_ms=100, timeout=PERFORMANCE_LOAD_TIMEOUT):
+    """
+    Wait for the current page's load event and read its timing entries in one round-trip.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        settle_ms (int): Time given to the Largest Contentful Paint observer.
+        timeout (float): Seconds to wait for the load event before a TimeoutException.
+
+    Returns:
+        dict: `ttfb`, `dom_content_loaded`, `load` and `lcp` in milliseconds (None
+        when the browser does not report them), `transfer_bytes`, and one
+        {name, type, start, duration, transfer_bytes} row per resource.
+    """
+    # Set explicitly; a pooled driver otherwise keeps the timeout of whichever wait used it last
+    driver.set_script_timeout(timeout + settle_ms / 1000)
+    return driver.execute_async_script(PERFORMANCE_SCRIPT, settle_ms)
+
+
+@contextmanager
+def cache_disabled(driver, disabled=True):
+    """Bypass the browser's HTTP cache for the duration of a `with` block, so loads are measured cold."""
+    if not disabled:
+        yield driver
+        return
+    _cdp(driver, "Network.enable", {})
+    _cdp(driver, "Network.setCacheDisabled", {"cacheDisabled": True})
+    try:
+        yield driver
+    finally:
+        _cdp(driver, "Network.setCacheDisabled", {"cacheDisabled": False})
+
+
+def quit_driver(driver):
+    """Quit a driver, ignoring errors from sessions that are already gone."""
+    try:
+        driver.quit()
+    except DRIVER_ERRORS:
+        pass
+    if getattr(driver, "user_data_dir", None):
+        shutil.rmtree(driver.user_data_dir, ignore_errors=True)
+
+
+class DriverPool:
+    """
+    A bounded pool of reusable WebDriver sessions.
+
+    Borrowed drivers are health-checked before being handed out, reset
+    (cookies, storage, about:blank) when returned, and recycled once they
+    have been used `max_uses` times.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES, factory=get_driver):
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Borrow a healthy driver, creating one if no idle driver is available."""
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    driver = self.factory()
+                    with self._lock:
+                        self._uses[id(driver)] = 0
+                    return driver
+
+                if self.is_healthy(driver):
+                    return driver
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver):
+        """Return a driver to the pool, recycling it when worn out or broken."""
+        try:
+            with self._lock:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+                worn_out = self._uses[id(driver)] >= self.max_uses
+
+            if worn_out or not self.reset(driver):
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def is_healthy(driver):
+        """Check that the browser session still responds to commands."""
+        try:
+            driver.current_url
+            return True
+        except DRIVER_ERRORS:
+            return False
+
+    @staticmethod
+    def reset(driver):
+        """Clear cookies and storage and park the browser on about:blank."""
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            driver.get("about:blank")
+            return True
+        except DRIVER_ERRORS:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        quit_driver(driver)
+
+    def close(self):
+        """Quit every idle driver held by the pool."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_factory = DriverPool
+_pool_config = None
+
+
+def set_pool_factory(factory):
+    """
+    Choose what the shared pool is built from (DriverPool by default).
+
+    The factory is called with `size` and `max_uses` keyword arguments, so a
+    scheduler such as utils.grid.Grid can stand in for the local pool.
+    """
+    global _pool_factory
+    with _pool_lock:
+        _pool_factory = factory
+
+
+def get_pool():
+    """Return the process-wide driver pool, creating it on first use."""
+    global _pool, _pool_config
+    with _pool_lock:
+        if _pool is None:
+            _pool = _pool_factory(size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES)
+            _pool_config = (_pool_factory, DRIVER_POOL_SIZE, DRIVER_MAX_USES, _interceptor)
+        return _pool
+
+
+def configure_pool(size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES):
+    """
+    Replace the shared pool with one of the given size and recycle limit.
+
+    A pool that already has this configuration is kept, so a long-lived
+    process (`app.py --serve`) reuses its warm browsers from run to run.
+    """
+    global _pool, _pool_config
+    config = (_pool_factory, size, max_uses, _interceptor)
+    with _pool_lock:
+        if _pool is not None and _pool_config == config:
+            return _pool
+        if _pool is not None:
+            _pool.close()
+        _pool = _pool_factory(size=size, max_uses=max_uses)
+        _pool_config = config
+        return _pool
+
+
+def close_pool():
+    """Quit all pooled drivers."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+@contextmanager
+def borrow_driver(needs=()):
+    """
+    Borrow a driver from the shared pool for the duration of a `with` block.
+
+    Args:
+        needs (iterable): Resource categories (see BLOCKABLE_RESOURCES) the
+            borrower needs; everything else is blocked in the fast profile.
+    """
+    pool = get_pool()
+    driver = pool.acquire()
+    try:
+        block_resources(driver, needs)
+        yield driver
+    finally:
+        pool.release(driver)
@@ -1,4 +1,99 @@
 BASE_URL = "https://www.alojamiento.io/property/es-moli-dels-reis/BC-8347060"
 WEBDRIVER_PATH = "./drivers/chromedriver"
-EXCEL_OUTPUT = "./output/test_results.xlsx"
-WAIT_TIME = 5
\ No newline at end of file
+EXCEL_OUTPUT = "./output/test_results.xlsx"  # Excel export generated from RESULTS_DB
+RESULTS_DB = "./output/results.sqlite"  # Append-only store of every result row
+WAIT_TIME = 5
+
+# Browser settings
+BROWSER_PROFILE = "fast"  # "fast": headless, eager, heavy resources blocked; "full": headed, maximized
+BROWSER_PROFILE_TEMPLATE = "./output/chrome-profile"  # Pre-warmed user-data dir copied for each browser
+
+# Driver pool settings
+DRIVER_POOL_SIZE = 4  # Maximum number of browsers alive at the same time (at least one per worker)
+DRIVER_MAX_USES = 20  # Recycle a browser after it has been borrowed this many times
+
+# Runner settings
+RUNNER_WORKERS = 2  # Number of checks executed concurrently by app.py
+
+# Page snapshot settings
+SNAPSHOT_DIR = "./output/snapshots"  # Where snapshots are written for offline re-checks
+SAVE_SNAPSHOTS = False  # Write every captured snapshot to SNAPSHOT_DIR
+SNAPSHOT_PAGE_SOURCE = False  # Keep each page's full HTML on its snapshot; it grows with the page
+
+# Link checker settings
+LINK_CHECK_WORKERS = 16  # Links probed concurrently
+LINK_CHECK_PER_HOST = 4  # Concurrent requests allowed against a single host
+LINK_CHECK_TIMEOUT = 5  # Seconds before a link probe gives up
+LINK_HOST_MAX_FAILURES = 3  # Connection failures in a row after which a host's remaining links are not probed (None: never)
+LINK_DROP_PARAMS = ("utm_*", "gclid", "fbclid", "msclkid")  # Query parameters (glob patterns) removed from links before probing
+
+# Link status cache settings
+LINK_CACHE_ENABLED = True
+LINK_CACHE_PATH = "./output/link_cache.sqlite"
+LINK_CACHE_TTL = 24 * 60 * 60  # Seconds a passing link is trusted before it is probed again
+LINK_CACHE_MAX_ENTRIES = 50000  # Least recently used entries beyond this are evicted
+
+# Crawl mode settings
+CRAWL_MAX_DEPTH = 1  # Link hops followed from the seed pages when crawling
+CRAWL_MAX_PAGES = 1000  # Stop adding pages to the frontier after this many
+
+# Adaptive wait settings
+WAIT_HISTORY = "./output/wait_timings.json"  # Past wait durations used to size timeouts
+WAIT_HISTORY_SIZE = 20  # Durations remembered per wait
+WAIT_TIMEOUT_FACTOR = 3  # Timeout is this multiple of the slowest remembered duration
+WAIT_TIME_MIN = 2  # Adaptive timeouts never drop below this many seconds
+WAIT_TIME_MAX = 30  # ...or rise above this many seconds
+
+# Currency test settings
+CURRENCY_WORKERS = 4  # Browser sessions the currency cases are split across
+CURRENCY_URL_PARAM = None  # Query parameter that selects the currency (e.g. "currency"), if the site has one
+CURRENCY_COOKIE = None  # Cookie that selects the currency, if the site has one
+
+# Page engine settings
+PAGE_ENGINE = "auto"  # "static": HTTP fetch + HTML parse; "browser": Chrome; "auto": static, falling back to Chrome
+STATIC_REQUIRED_ELEMENTS = ("headers", "links")  # Auto mode uses Chrome when the static HTML lacks any of these
+
+# Incremental re-validation settings
+CHECK_CACHE_DB = "./output/check_cache.sqlite"  # Content hashes and results of previous checks
+FORCE_REFRESH = False  # Re-run every check even when its inputs are unchanged
+
+# Distributed execution settings
+GRID_NODES = ()  # (url, capacity) pairs of Selenium Grid nodes or chromedrivers; empty runs Chrome locally
+GRID_NODE_CAPACITY = 2  # Browsers per node when a node is given without a capacity
+GRID_RETRIES = 2  # Times a check is retried on another node after its node fails
+GRID_NODE_COOLDOWN = 60  # Seconds a failed node is left out before it is tried again
+LOCAL_NODE_PORT = 9515  # First port used by --local-nodes chromedriver processes
+
+# Streaming and early-abort settings
+EVENTS_OUTPUT = None  # JSON-lines event stream: a file path, "-" for stdout, or None for no stream
+FAIL_FAST = False  # Stop starting new checks after the first failed result
+LINK_MAX_FAILURES = None  # Stop probing a page's links after this many broken ones (None: probe all)
+TIME_BUDGET = None  # Seconds the whole run may take before remaining work is skipped (None: no limit)
+
+# Memory settings for very large pages
+ELEMENT_CHUNK_SIZE = 1000  # Elements fetched from the browser per execute_script round-trip
+LINK_CHECK_IN_FLIGHT = 64  # Link checks queued at once; results are consumed as they finish
+FAILURE_DETAILS_MAX = 50  # Failure details kept in a report comment; the rest go to FAILURE_LOG_DIR
+FAILURE_LOG_DIR = "./output/failures"
+
+# Persistent process settings
+DAEMON_ADDRESS = ("localhost", 6150)  # Where `app.py --serve` listens for runs sent by `python -m utils.daemon`
+DAEMON_AUTHKEY_FILE = "./output/daemon.key"  # Random secret clients must present; created (mode 0600) by the first --serve
+
+# Record/replay settings
+HTTP_ARCHIVE_DIR = "./output/http_archive"  # Content-addressed response bodies plus an SQLite index
+HTTP_ARCHIVE_MODE = None  # "record": fetch live and archive; "replay": serve only from the archive; None: live
+
+# Page performance settings
+PERFORMANCE_BUDGETS = {  # Maximum allowed value per metric column; a missing or None entry is not checked
+    "TTFB (ms)": 800,
+    "DOM Content Loaded (ms)": 2500,
+    "Load (ms)": 5000,
+    "LCP (ms)": 2500,
+    "Transfer (KB)": 3000,
+    "Requests": 150,
+}
+PERFORMANCE_SHARED_LOAD = False  # Snapshots load in Chrome with every resource so the performance check reuses that load
+PERFORMANCE_LOAD_TIMEOUT = 30  # Seconds a measured page is given to fire its load event
+PERFORMANCE_COLD_CACHE = True  # Disable the browser's HTTP cache while a page is measured
+PERFORMANCE_SLOWEST_RESOURCES = 5  # Slowest resources named in the performance check's comments
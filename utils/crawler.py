@@ -0,0 +1,142 @@
+import threading
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
+from utils import policy
+from utils.browser import configure_pool
+from utils.config import CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES, RUNNER_WORKERS, DRIVER_POOL_SIZE, DRIVER_MAX_USES
+from utils.link_cache import normalize_url
+from utils.reporter import flush_report
+from utils.runner import import_checks, run_check
+from utils.snapshot import get_snapshot, discard_snapshot
+from tests.test_url_status_404 import get_all_links
+
+
+def read_url_list(path):
+    """Read one URL per line, skipping blank lines and `#` comments."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def read_sitemap(path):
+    """Return the page URLs listed in the <loc> elements of a sitemap file."""
+    root = ET.parse(path).getroot()
+    return [el.text.strip() for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "loc" and el.text]
+
+
+def _host(url):
+    """The host name of a URL, or None when the URL cannot be parsed."""
+    try:
+        return urlsplit(url).hostname
+    except ValueError:
+        return None
+
+
+class Frontier:
+    """
+    Queue of pages still to audit, deduplicated through a visited set.
+
+    Only same-domain http(s) pages within `max_depth` hops of a seed are
+    accepted, and no more than `max_pages` pages are ever queued.
+    """
+
+    def __init__(self, seeds, max_depth=CRAWL_MAX_DEPTH, max_pages=CRAWL_MAX_PAGES):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.hosts = {_host(url) for url in seeds}
+        self.hosts.discard(None)
+        self.visited = set()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        for url in seeds:
+            self.add(url, 0)
+
+    def add(self, url, depth):
+        """Queue a page if it is new, in scope and within the limits."""
+        try:
+            parts = urlsplit(url)
+            parts.port  # Raises ValueError for a port that is not a number
+            key = normalize_url(url)
+        except ValueError:
+            print(f"Skipping malformed URL: {url}")
+            return False
+        if parts.scheme not in ("http", "https") or parts.hostname not in self.hosts or depth > self.max_depth:
+            return False
+        with self._lock:
+            if key in self.visited or len(self.visited) >= self.max_pages:
+                return False
+            self.visited.add(key)
+            self._queue.append((key, depth))
+            return True
+
+    def pop(self):
+        """Return the next (url, depth) pair, or None when the frontier is empty."""
+        with self._lock:
+            return self._queue.popleft() if self._queue else None
+
+
+def audit_page(url, checks, discover):
+    """
+    Run every check on one page and stream its rows into the report.
+
+    Returns:
+        list: Check results, one dictionary per check.
+        set: Links found on the page when `discover` is set, else empty.
+    """
+    results = [run_check(module, function, url) for module, function in checks]
+    links = set()
+    if discover:
+        try:
+            links = get_all_links(get_snapshot(url))
+        except Exception as e:
+            print(f"Error while collecting links from {url}: {e}")
+
+    discard_snapshot(url)
+    # Results are written as each page finishes instead of at the end of the crawl
+    flush_report()
+    return results, links
+
+
+def crawl(frontier, checks, workers=RUNNER_WORKERS, discover=False):
+    """
+    Audit every page in the frontier across a pool of browsers.
+
+    Args:
+        frontier (Frontier): Pages to audit; discovered links are added to it.
+        checks (list): (module_name, function_name) pairs run on each page.
+        workers (int): Number of pages audited at the same time.
+        discover (bool): Follow same-domain links found on audited pages.
+
+    Returns:
+        list: Check results for every audited page.
+    """
+    workers = max(1, workers)
+    configure_pool(size=max(workers, DRIVER_POOL_SIZE), max_uses=DRIVER_MAX_USES)
+    import_checks(checks)
+
+    results = []
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page") as executor:
+        while True:
+            # Keep every worker busy while there are pages left, unless a policy stopped the run
+            while len(running) < workers and not policy.stop_reason():
+                page = frontier.pop()
+                if page is None:
+                    break
+                url, depth = page
+                running[executor.submit(audit_page, url, checks, discover)] = depth
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth = running.pop(future)
+                page_results, links = future.result()
+                results.extend(page_results)
+                for link in links:
+                    frontier.add(link, depth + 1)
+
+    print(f"Crawl finished: {len(frontier.visited)} pages audited.")
+    return results
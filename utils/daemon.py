@@ -0,0 +1,91 @@
+import os
+import secrets
+import stat
+import sys
+import threading
+from multiprocessing.connection import Client
+from utils.config import DAEMON_ADDRESS, DAEMON_AUTHKEY_FILE
+
+
+# Kept free of selenium, requests and pandas imports so a client starts in milliseconds
+
+
+def load_authkey(path=DAEMON_AUTHKEY_FILE, create=False):
+    """
+    Read the daemon's secret, creating a random one readable only by this user if asked.
+
+    Connections unpickle what they receive once authenticated, so the key must
+    never be shared: a key file other users can read is refused.
+
+    Raises:
+        FileNotFoundError: If the key does not exist and `create` is False.
+        PermissionError: If the key file is accessible to other users.
+    """
+    if create and not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # Another daemon created it first
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+
+    if os.name == "posix" and os.stat(path).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise PermissionError(f"{path} is accessible to other users; run `chmod 600 {path}`.")
+    with open(path, encoding="ascii") as f:
+        return f.read().strip().encode("ascii")
+
+
+class ConnectionWriter:
+    """A file-like stream that forwards everything written to it to a daemon client."""
+
+    def __init__(self, conn, stream):
+        self.conn = conn
+        self.stream = stream
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        # A client that went away must not make the run itself fail
+        if text and not self.closed:
+            with self._lock:
+                try:
+                    self.conn.send((self.stream, text))
+                except OSError:
+                    self.closed = True
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def run_remote(argv, address=DAEMON_ADDRESS, authkey=None):
+    """
+    Send app.py arguments to a running `app.py --serve` process and relay its output.
+
+    Args:
+        authkey (bytes): The daemon's secret; read from DAEMON_AUTHKEY_FILE by default.
+
+    Returns:
+        int: The exit status of the served run.
+    """
+    with Client(address, authkey=authkey or load_authkey()) as conn:
+        conn.send(list(argv))
+        while True:
+            kind, payload = conn.recv()
+            if kind == "exit":
+                return payload
+            stream = sys.stderr if kind == "stderr" else sys.stdout
+            stream.write(payload)
+            stream.flush()
+
+
+if __name__ == "__main__":
+    # e.g. python -m utils.daemon --crawl --max-pages 50
+    try:
+        sys.exit(run_remote(sys.argv[1:]))
+    except FileNotFoundError:
+        sys.exit(f"No daemon key at {DAEMON_AUTHKEY_FILE}; start a daemon with `python app.py --serve`.")
+    except ConnectionRefusedError:
+        sys.exit(f"No daemon is listening on {DAEMON_ADDRESS[0]}:{DAEMON_ADDRESS[1]}; start one with `python app.py --serve`.")
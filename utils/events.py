@@ -0,0 +1,56 @@
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+
+
+# Open event sink (a file object) and whether it belongs to this module
+_sink = None
+_owned = False
+_lock = threading.Lock()
+
+
+def open_events(target):
+    """
+    Start streaming events as JSON lines.
+
+    Args:
+        target (str): A file path, or '-' for standard output.
+    """
+    global _sink, _owned
+    close_events()
+    with _lock:
+        if target == "-":
+            _sink, _owned = sys.stdout, False
+        else:
+            _sink, _owned = open(target, "a", encoding="utf-8"), True
+
+
+def close_events():
+    """Stop streaming and close the event file, if one was opened."""
+    global _sink, _owned
+    with _lock:
+        if _sink is not None and _owned:
+            _sink.close()
+        _sink, _owned = None, False
+
+
+def emit(event, **fields):
+    """
+    Write one event line, e.g. emit('check_end', check='tests.test_h1_tag', status='ok').
+
+    Every line carries the event name, an ISO timestamp and a monotonic `t`
+    so consumers can order and time events; nothing is written when no
+    stream is open.
+    """
+    if _sink is None:
+        return
+    line = json.dumps(
+        {"event": event, "time": datetime.now().isoformat(timespec="milliseconds"), "t": time.monotonic(), **fields},
+        ensure_ascii=False, default=str,
+    )
+    with _lock:
+        if _sink is not None:
+            _sink.write(line + "\n")
+            _sink.flush()
@@ -0,0 +1,61 @@
+import os
+import re
+import threading
+import uuid
+from utils.config import FAILURE_DETAILS_MAX, FAILURE_LOG_DIR
+
+
+class FailureLog:
+    """
+    Collects the failure details of one check without holding them all in memory.
+
+    The first `limit` details are kept for the report comment. Once the limit
+    is passed, every detail is written to a text file in FAILURE_LOG_DIR
+    instead, and the comment says how many more there are and where.
+    """
+
+    def __init__(self, name, limit=FAILURE_DETAILS_MAX, directory=FAILURE_LOG_DIR):
+        self.name = name
+        self.limit = limit
+        self.directory = directory
+        self.count = 0
+        self.details = []
+        self.path = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def add(self, detail):
+        """Record one failure (e.g. a broken link's description)."""
+        with self._lock:
+            self.count += 1
+            if len(self.details) < self.limit:
+                self.details.append(detail)
+                return
+            if self._file is None:
+                # Spill to disk, starting with the details already kept for the comment
+                os.makedirs(self.directory, exist_ok=True)
+                slug = re.sub(r"[^A-Za-z0-9]+", "-", self.name).strip("-")[:80]
+                self.path = os.path.join(self.directory, f"{slug}-{uuid.uuid4().hex[:8]}.txt")
+                self._file = open(self.path, "w", encoding="utf-8")
+                self._file.writelines(f"{kept}\n" for kept in self.details)
+            self._file.write(f"{detail}\n")
+
+    def summary(self, separator=", "):
+        """Join the kept details, noting how many more were written to the spill file."""
+        text = separator.join(self.details)
+        if self.count > len(self.details):
+            text += f"{separator}... and {self.count - len(self.details)} more (all {self.count} in {self.path})"
+        return text
+
+    def close(self):
+        """Close the spill file, if one was opened."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,166 @@
+import atexit
+import subprocess
+import threading
+import time
+from functools import partial
+from utils import tracing
+from utils.browser import DRIVER_ERRORS, DriverPool, get_remote_driver, set_pool_factory
+from utils.config import (
+    WEBDRIVER_PATH, DRIVER_MAX_USES, GRID_NODE_CAPACITY, GRID_NODE_COOLDOWN, LOCAL_NODE_PORT,
+)
+
+
+class NoNodeAvailable(RuntimeError):
+    """Raised when every node is down and no browser can be started."""
+
+
+class Node:
+    """One Grid node or chromedriver process and the browsers open on it."""
+
+    def __init__(self, url, capacity=GRID_NODE_CAPACITY, max_uses=DRIVER_MAX_USES):
+        self.url = url
+        self.capacity = capacity
+        self.pool = DriverPool(size=capacity, max_uses=max_uses, factory=partial(get_remote_driver, url))
+        self.active = 0
+        self.failures = 0
+        self.down_until = 0
+
+    @property
+    def load(self):
+        return self.active / self.capacity
+
+    def is_up(self):
+        return time.monotonic() >= self.down_until
+
+
+class Grid:
+    """
+    Spreads browser sessions across several nodes.
+
+    Drop-in replacement for DriverPool: each `acquire` goes to the least-loaded
+    node that is up and below its capacity, waiting while every node is full.
+    A node whose browser dies is left out for GRID_NODE_COOLDOWN seconds, and
+    the check that was using it is flagged so the runner can retry it.
+    """
+
+    def __init__(self, nodes, size=None, max_uses=DRIVER_MAX_USES):
+        # `size` is accepted for compatibility with DriverPool; capacity comes from the nodes
+        self.nodes = [Node(url, capacity, max_uses) for url, capacity in nodes]
+        self.size = sum(node.capacity for node in self.nodes)
+        self._owners = {}
+        self._failed_checks = set()
+        self._available = threading.Condition()
+
+    def _pick(self):
+        """Reserve a slot on the least-loaded node, waiting while all nodes are full."""
+        with self._available:
+            while True:
+                up = [node for node in self.nodes if node.is_up()]
+                if not up:
+                    raise NoNodeAvailable("Every grid node is down.")
+                free = [node for node in up if node.active < node.capacity]
+                if free:
+                    node = min(free, key=lambda n: n.load)
+                    node.active += 1
+                    return node
+                self._available.wait(timeout=1)
+
+    def _mark_failed(self, node):
+        with self._available:
+            node.failures += 1
+            node.down_until = time.monotonic() + GRID_NODE_COOLDOWN
+        print(f"Grid node {node.url} failed; leaving it out for {GRID_NODE_COOLDOWN}s.")
+        node.pool.close()
+
+    def _free(self, node):
+        with self._available:
+            node.active -= 1
+            self._available.notify()
+
+    def acquire(self):
+        """Borrow a driver from the least-loaded node, moving on if a node cannot start one."""
+        while True:
+            node = self._pick()
+            try:
+                driver = node.pool.acquire()
+            except DRIVER_ERRORS:
+                self._free(node)
+                self._mark_failed(node)
+                continue
+            with self._available:
+                self._owners[id(driver)] = node
+            return driver
+
+    def release(self, driver):
+        """Return a driver to its node, flagging the current check if the node died under it."""
+        with self._available:
+            node = self._owners.pop(id(driver))
+        try:
+            if not node.pool.is_healthy(driver):
+                check = tracing.current_check()
+                if check is not None:
+                    with self._available:
+                        self._failed_checks.add(check)
+                self._mark_failed(node)
+            node.pool.release(driver)
+        finally:
+            self._free(node)
+
+    def take_failure(self, check):
+        """Return True (once) if a node failed while `check` was using it."""
+        with self._available:
+            if check in self._failed_checks:
+                self._failed_checks.remove(check)
+                return True
+            return False
+
+    def close(self):
+        """Quit every idle driver on every node."""
+        for node in self.nodes:
+            node.pool.close()
+
+
+def parse_node(spec):
+    """Parse 'URL' or 'URL=CAPACITY' into a (url, capacity) pair."""
+    url, _, capacity = spec.partition("=")
+    return url, int(capacity) if capacity else GRID_NODE_CAPACITY
+
+
+def use_grid(nodes):
+    """Make the shared driver pool a Grid over the given (url, capacity) nodes, or local if there are none."""
+    set_pool_factory(partial(Grid, list(nodes)) if nodes else DriverPool)
+
+
+_processes = []
+
+
+def start_local_nodes(count, port=LOCAL_NODE_PORT):
+    """
+    Start `count` chromedriver processes on consecutive ports to act as local nodes.
+
+    Returns:
+        list: The node URLs, e.g. ['http://localhost:9515', 'http://localhost:9516'].
+    """
+    urls = []
+    for offset in range(count):
+        _processes.append(subprocess.Popen(
+            [WEBDRIVER_PATH, f"--port={port + offset}"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+        urls.append(f"http://localhost:{port + offset}")
+    time.sleep(1)  # chromedriver needs a moment before it accepts sessions
+    return urls
+
+
+def stop_local_nodes():
+    """Terminate the chromedriver processes started by `start_local_nodes`."""
+    while _processes:
+        process = _processes.pop()
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+atexit.register(stop_local_nodes)
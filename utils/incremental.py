@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from utils.config import CHECK_CACHE_DB, FORCE_REFRESH
+
+
+_lock = threading.Lock()
+_force_refresh = FORCE_REFRESH
+
+
+def set_force_refresh(enabled):
+    """Turn result reuse off (True) or back on (False) for the rest of the process."""
+    global _force_refresh
+    _force_refresh = enabled
+
+
+def content_hash(snapshot, inputs):
+    """
+    Hash the snapshot fields a check reads (e.g. ('headers',) or ('images',)), with the
+    number of elements each matched, since a snapshot keeps only some images' rows.
+    """
+    payload = json.dumps(
+        [[snapshot.get(name), snapshot.counts.get(name)] for name in inputs], sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS checks (
+            page_url TEXT NOT NULL,
+            check_name TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            row TEXT NOT NULL,
+            checked_at REAL NOT NULL,
+            PRIMARY KEY (page_url, check_name)
+        )
+        """
+    )
+    return conn
+
+
+def reuse_or_run(snapshot, check_name, inputs, run, reuse_failures=True, max_age=None, path=CHECK_CACHE_DB):
+    """
+    Return the previous result of a check if its inputs are unchanged, else run it.
+
+    Args:
+        snapshot (PageSnapshot): The page being checked.
+        check_name (str): Name the result is stored under (e.g. 'H1 Tag Test').
+        inputs (tuple): Snapshot fields the check reads; only these are hashed.
+        run (callable): Runs the check and returns its report row.
+        reuse_failures (bool): Whether a previous result other than 'Passed' may be reused.
+        max_age (float): Seconds after which a stored result is re-validated anyway.
+
+    Returns:
+        dict: The report row, with a 'Reused' column saying where it came from.
+    """
+    digest = content_hash(snapshot, inputs)
+
+    if not _force_refresh:
+        with _lock:
+            conn = _connect(path)
+            try:
+                stored = conn.execute(
+                    "SELECT content_hash, row, checked_at FROM checks WHERE page_url = ? AND check_name = ?",
+                    (snapshot.url, check_name),
+                ).fetchone()
+            finally:
+                conn.close()
+
+        if stored and stored[0] == digest and (max_age is None or time.time() - stored[2] <= max_age):
+            row = json.loads(stored[1])
+            if reuse_failures or row.get("Status") == "Passed":
+                print(f"{check_name}: inputs unchanged on {snapshot.url}, reusing previous result.")
+                return {**row, "Reused": True}
+
+    row = run()
+    with _lock:
+        conn = _connect(path)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO checks (page_url, check_name, content_hash, row, checked_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (snapshot.url, check_name, digest, json.dumps(row, ensure_ascii=False, default=str), time.time()),
+                )
+        finally:
+            conn.close()
+    return {**row, "Reused": False}
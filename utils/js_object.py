@@ -0,0 +1,256 @@
+import json
+import re
+
+
+WHITESPACE = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+DOUBLE_QUOTED = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+SINGLE_QUOTED = re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL)
+TEMPLATE = re.compile(r"`(?:[^`\\$]|\\.|\$(?!\{))*`", re.DOTALL)
+REGEX = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+# A '/' after one of these (or at the start of a value) begins a regex literal, not a division
+REGEX_PRECEDERS = "(,=:[!&|?{};+-*%<>~^"
+NUMBER = re.compile(r"[-+]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+ESCAPE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)", re.DOTALL)
+LITERALS = {"true": True, "false": False, "null": None, "undefined": None, "NaN": None, "Infinity": None}
+
+
+class JSParseError(ValueError):
+    """Raised when text at the given position is not a JavaScript literal."""
+
+
+def _unescape(match):
+    escape = match.group(1)
+    if escape[0] == "u":
+        return chr(int(escape[1:].strip("{}"), 16))
+    if escape[0] == "x":
+        return chr(int(escape[1:], 16))
+    if escape in ("\n", "\r\n", "\r"):
+        return ""  # Line continuation
+    return ESCAPES.get(escape, escape)
+
+
+class JSObjectParser:
+    """
+    Parses a JavaScript object/array literal starting at a position in a larger source.
+
+    Handles unquoted and quoted keys, single/double/backtick strings, nested
+    objects and arrays, comments and trailing commas. Values that are not
+    literals (function calls, expressions) are skipped and returned as None.
+    """
+
+    def __init__(self, source, pos=0):
+        self.source = source
+        self.pos = pos
+
+    def _skip_space(self):
+        self.pos = WHITESPACE.match(self.source, self.pos).end()
+
+    def _peek(self):
+        self._skip_space()
+        return self.source[self.pos] if self.pos < len(self.source) else ""
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise JSParseError(f"Expected '{char}' at position {self.pos}")
+        self.pos += 1
+
+    def _string(self):
+        quote = self.source[self.pos]
+        pattern = {'"': DOUBLE_QUOTED, "'": SINGLE_QUOTED, "`": TEMPLATE}[quote]
+        match = pattern.match(self.source, self.pos)
+        if not match:
+            raise JSParseError(f"Unterminated string at position {self.pos}")
+        self.pos = match.end()
+        return ESCAPE.sub(_unescape, match.group()[1:-1])
+
+    def _key(self):
+        char = self._peek()
+        if char in "\"'`":
+            return self._string()
+        if char == "[":
+            raise JSParseError(f"Computed key at position {self.pos}")
+        match = IDENTIFIER.match(self.source, self.pos) or NUMBER.match(self.source, self.pos)
+        if not match:
+            raise JSParseError(f"Invalid key at position {self.pos}")
+        self.pos = match.end()
+        return match.group()
+
+    def _skip_template(self):
+        """Skip a template literal, including the expressions in its ${...} substitutions."""
+        self.pos += 1
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == "\\":
+                self.pos += 2
+            elif char == "`":
+                self.pos += 1
+                return
+            elif self.source.startswith("${", self.pos):
+                self.pos += 2
+                self._skip_expression()
+                self.pos += 1  # The substitution's closing '}'
+            else:
+                self.pos += 1
+        raise JSParseError("Unterminated template literal")
+
+    def _skip_expression(self):
+        """
+        Skip a non-literal value up to the next top-level ',', '}' or ']'.
+
+        Strings, template substitutions, regex literals and comments are skipped
+        whole, so brackets and commas inside them do not end the value.
+        """
+        depth = 0
+        previous = ""  # Last significant character, to tell a regex literal from a division
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == "`":
+                self._skip_template()
+                previous = char
+                continue
+            if char in "\"'":
+                match = (DOUBLE_QUOTED if char == '"' else SINGLE_QUOTED).match(self.source, self.pos)
+                # An unmatched quote is passed over; the value is skipped either way
+                self.pos = match.end() if match else self.pos + 1
+                previous = char
+                continue
+            if char == "/":
+                if self.source.startswith(("//", "/*"), self.pos):
+                    self._skip_space()
+                    continue
+                match = REGEX.match(self.source, self.pos)
+                if match and (not previous or previous in REGEX_PRECEDERS):
+                    self.pos = match.end()
+                    previous = "/"
+                    continue
+            if char in "([{":
+                depth += 1
+            elif char in ")]}":
+                if depth == 0:
+                    return None
+                depth -= 1
+            elif char == "," and depth == 0:
+                return None
+            if not char.isspace():
+                previous = char
+            self.pos += 1
+        raise JSParseError("Unexpected end of source")
+
+    def parse_value(self):
+        """Parse the value at the current position and move past it."""
+        char = self._peek()
+        if char == "{":
+            return self._object()
+        if char == "[":
+            return self._array()
+        if char in "\"'`":
+            start = self.pos
+            try:
+                return self._string()
+            except JSParseError:
+                # e.g. a template literal with ${...} substitutions, which is not a constant
+                self.pos = start
+                return self._skip_expression()
+
+        match = NUMBER.match(self.source, self.pos)
+        if match and not IDENTIFIER.match(self.source, match.end()):
+            self.pos = match.end()
+            text = match.group()
+            if text.lower().lstrip("+-").startswith("0x"):
+                return int(text, 16)
+            number = float(text)
+            return int(number) if number.is_integer() and not re.search(r"[.eE]", text) else number
+
+        match = IDENTIFIER.match(self.source, self.pos)
+        if match and match.group() in LITERALS:
+            end = WHITESPACE.match(self.source, match.end()).end()
+            if end >= len(self.source) or self.source[end] in ",}];":
+                self.pos = match.end()
+                return LITERALS[match.group()]
+        return self._skip_expression()
+
+    def _member(self, closing):
+        """Parse an object or array member; one that continues as an expression (e.g. `4 / 2`) is None."""
+        start = self.pos
+        value = self.parse_value()
+        if self._peek() not in "," + closing:
+            self.pos = start
+            self._skip_space()
+            value = self._skip_expression()
+        return value
+
+    def _object(self):
+        self._expect("{")
+        result = {}
+        while self._peek() != "}":
+            if self._peek() == "." and self.source.startswith("...", self.pos):
+                raise JSParseError(f"Spread syntax at position {self.pos}")
+            key = self._key()
+            if self._peek() in ",}":
+                result[key] = None  # Shorthand property; its value is a variable
+            else:
+                self._expect(":")
+                result[key] = self._member("}")
+            if self._peek() == ",":
+                self.pos += 1
+            elif self._peek() != "}":
+                raise JSParseError(f"Expected ',' or '}}' at position {self.pos}")
+        self.pos += 1
+        return result
+
+    def _array(self):
+        self._expect("[")
+        result = []
+        while self._peek() != "]":
+            result.append(self._member("]"))
+            if self._peek() == ",":
+                self.pos += 1
+            elif self._peek() != "]":
+                raise JSParseError(f"Expected ',' or ']' at position {self.pos}")
+        self.pos += 1
+        return result
+
+
+def parse_js_value(source, pos=0):
+    """Parse the JavaScript literal at `pos` in `source` and return it as Python data."""
+    return JSObjectParser(source, pos).parse_value()
+
+
+def find_assignments(source, names):
+    """
+    Locate `name = <literal>` and `name: <literal>` occurrences in one scan of the source.
+
+    Args:
+        source (str): Page source or script text, possibly several MB long.
+        names (iterable): Variable or property names to look for.
+
+    Returns:
+        dict: Maps each name found to the parsed value of its last literal occurrence.
+    """
+    pattern = re.compile(r"(?<![\w$])(" + "|".join(map(re.escape, names)) + r")\s*(?:=(?!=)|:)\s*")
+    found = {}
+    for match in pattern.finditer(source):
+        try:
+            value = parse_js_value(source, match.end())
+        except JSParseError:
+            continue
+        # Non-literal occurrences (comments, expressions) parse to None and are ignored
+        if value is not None:
+            found[match.group(1)] = value
+    return found
+
+
+def flatten(data, prefix=""):
+    """Flatten nested dictionaries into dotted keys; lists become JSON strings."""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value, ensure_ascii=False)
+        else:
+            flat[name] = value
+    return flat
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+import time
+from fnmatch import fnmatchcase
+from urllib.parse import urlsplit, urlunsplit
+from utils.config import LINK_CACHE_PATH, LINK_CACHE_TTL, LINK_CACHE_MAX_ENTRIES, LINK_DROP_PARAMS
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url, drop_params=LINK_DROP_PARAMS):
+    """
+    Canonicalize a URL so every spelling of a link is probed and cached once.
+
+    The scheme and host are lower-cased, a default port, the fragment and
+    query parameters matching `drop_params` (e.g. 'utm_*') are removed, an
+    empty path becomes '/', and the remaining parameters are sorted by name.
+
+    >>> normalize_url("HTTPS://User@Example.COM:443?utm_source=x&b=2&a=1#top")
+    'https://User@example.com/?a=1&b=2'
+    >>> normalize_url("http://[::1]:80/x")
+    'http://[::1]/x'
+    >>> normalize_url("https://example.com:abc/")
+    'https://example.com:abc/'
+
+    Raises:
+        ValueError: If the URL cannot be split, e.g. an unclosed IPv6 bracket.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    # Built from netloc so userinfo and IPv6 brackets survive; only the host is lower-cased
+    userinfo, _, hostport = parts.netloc.rpartition("@")
+    host, port = hostport, ""
+    if not hostport.endswith("]") and ":" in hostport:
+        host, _, port = hostport.rpartition(":")
+    # Compared as text: parts.port raises ValueError for a port that is not a number
+    if port.isdigit() and int(port) == DEFAULT_PORTS.get(scheme):
+        port = ""
+    netloc = host.lower() + (f":{port}" if port else "")
+    if userinfo:
+        netloc = f"{userinfo}@{netloc}"
+
+    # Parameters are compared by their raw text so their encoding is left untouched;
+    # the sort is stable, keeping repeated names in their original order
+    params = [param for param in parts.query.split("&") if param]
+    params = [param for param in params if not any(fnmatchcase(param.split("=", 1)[0], p) for p in drop_params)]
+    query = "&".join(sorted(params, key=lambda param: param.split("=", 1)[0]))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def cache_key(url):
+    """The canonical form of a URL, or the URL itself when it is too malformed to canonicalize."""
+    try:
+        return normalize_url(url)
+    except ValueError:
+        return url
+
+
+class LinkCache:
+    """
+    On-disk cache of link probe results, keyed by canonical URL (see normalize_url).
+
+    Only passing results younger than `ttl` seconds are served from the cache;
+    stale and previously failing links are always probed again.
+    """
+
+    def __init__(self, path=LINK_CACHE_PATH, ttl=LINK_CACHE_TTL, max_entries=LINK_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Each write commits on its own, so concurrent checks (e.g. two pages in crawl
+        # mode) never wait on one another's scan; WAL keeps readers off the write lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS links (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER,
+                final_url TEXT,
+                ok INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+
+    def lookup(self, url):
+        """
+        Return the cached result for a URL if it is fresh and passing, else None.
+
+        Returns:
+            dict: The cached status code, final URL and check time.
+        """
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, final_url, checked_at FROM links WHERE url = ? AND ok = 1 AND checked_at >= ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE links SET accessed_at = ? WHERE url = ?", (now, key))
+        return {"status_code": row[0], "final_url": row[1], "checked_at": row[2]}
+
+    def store(self, url, status_code, final_url, ok):
+        """Record the outcome of probing a URL."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO links (url, status_code, final_url, ok, checked_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(url), status_code, final_url, int(ok), now, now),
+            )
+
+    def summary(self):
+        """Describe the hit/miss counts for the report."""
+        return f"Link cache: {self.hits} hits, {self.misses} misses."
+
+    def close(self):
+        """Evict least recently used entries beyond the size cap, then close."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM links WHERE url IN "
+                "(SELECT url FROM links ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,166 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from utils import policy, tracing
+from utils.config import (
+    LINK_CHECK_WORKERS, LINK_CHECK_PER_HOST, LINK_CHECK_TIMEOUT, LINK_CHECK_IN_FLIGHT, LINK_HOST_MAX_FAILURES,
+)
+
+
+# Statuses servers answer with when they do not support HEAD requests
+HEAD_REJECTED_STATUSES = {405, 501}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared keep-alive session used for all link probes."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=LINK_CHECK_WORKERS, pool_maxsize=LINK_CHECK_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+class HostUnavailable(RequestException):
+    """Raised instead of probing a host whose circuit breaker is open."""
+
+
+class HostBreaker:
+    """
+    Per-host circuit breaker: once a host fails to connect or answer
+    `max_failures` times in a row, its remaining links are not probed.
+    """
+
+    def __init__(self, max_failures=LINK_HOST_MAX_FAILURES):
+        self.max_failures = max_failures
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def check(self, url):
+        """Raise HostUnavailable if the URL's host has tripped the breaker."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            failures = self._failures.get(host, 0)
+        if self.max_failures is not None and failures >= self.max_failures:
+            raise HostUnavailable(f"{host} not probed after {failures} connection failures in a row")
+
+    def record(self, url, connected):
+        """Count a connection failure against the URL's host, or reset it after any response."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            self._failures[host] = 0 if connected else self._failures.get(host, 0) + 1
+
+
+def probe_url(url, timeout=LINK_CHECK_TIMEOUT, breaker=None):
+    """
+    Request a URL with HEAD, falling back to GET when the server rejects HEAD.
+
+    Args:
+        url (str): The URL to probe.
+        timeout (int): Seconds to wait for the server.
+        breaker (HostBreaker): Optional breaker that skips hosts which keep failing.
+
+    Returns:
+        requests.Response: The final response after redirects.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails, or
+            HostUnavailable if the breaker is open for the URL's host.
+    """
+    if breaker is not None:
+        breaker.check(url)
+    session = get_session()
+    try:
+        with tracing.span("HEAD", "http"):
+            response = session.head(url, allow_redirects=True, timeout=timeout)
+        if response.status_code in HEAD_REJECTED_STATUSES:
+            # Stream so only the headers are read before the connection is returned
+            with tracing.span("GET", "http"):
+                response = session.get(url, allow_redirects=True, timeout=timeout, stream=True)
+                response.close()
+    except (requests.ConnectionError, requests.Timeout):
+        # Only unreachable hosts trip the breaker; error statuses are still answers
+        if breaker is not None:
+            breaker.record(url, connected=False)
+        raise
+    if breaker is not None:
+        breaker.record(url, connected=True)
+    return response
+
+
+class HostLimiter:
+    """Caps the number of in-flight requests against each host."""
+
+    def __init__(self, per_host=LINK_CHECK_PER_HOST):
+        self.per_host = per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def slot(self, url):
+        """Return the semaphore guarding requests to the URL's host."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+
+def iter_check_urls(urls, validate, workers=LINK_CHECK_WORKERS, per_host=LINK_CHECK_PER_HOST,
+                    is_failure=None, max_failures=None, in_flight=LINK_CHECK_IN_FLIGHT):
+    """
+    Run a validation function over many URLs in parallel, politely, yielding results as they complete.
+
+    At most `in_flight` URLs are queued at once, so a page with tens of thousands
+    of links never holds a future or result for each of them.
+
+    Args:
+        urls (iterable): URLs to check.
+        validate (callable): Called with each URL; its return value is collected.
+        workers (int): Maximum number of URLs checked at the same time.
+        per_host (int): Maximum number of concurrent checks against one host.
+        is_failure (callable): Tells whether a result of `validate` is a failure.
+        max_failures (int): Stop validating once this many failures are seen.
+        in_flight (int): Most URLs submitted but not yet consumed.
+
+    Yields:
+        tuple: (url, result) pairs in the order the URLs were given; the result
+        is None for URLs skipped because of `max_failures` or a stopped run.
+    """
+    limiter = HostLimiter(per_host)
+    failures = [0]
+    failures_lock = threading.Lock()
+
+    # Probes run on pool threads but are still attributed to the calling check
+    @tracing.bind_check
+    def run(url):
+        if (max_failures is not None and failures[0] >= max_failures) or policy.stop_reason():
+            return url, None
+        with limiter.slot(url):
+            result = validate(url)
+        if is_failure is not None and is_failure(result):
+            with failures_lock:
+                failures[0] += 1
+        return url, result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="link") as executor:
+        pending = deque()
+        for url in urls:
+            pending.append(executor.submit(run, url))
+            if len(pending) >= max(in_flight, 1):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def check_urls(urls, validate, **kwargs):
+    """Run `iter_check_urls` to completion and return its (url, result) pairs as a list."""
+    return list(iter_check_urls(urls, validate, **kwargs))
@@ -0,0 +1,58 @@
+import threading
+import time
+from utils import events
+from utils.config import FAIL_FAST, LINK_MAX_FAILURES, TIME_BUDGET
+
+
+_lock = threading.Lock()
+_settings = {"fail_fast": FAIL_FAST, "link_max_failures": LINK_MAX_FAILURES, "time_budget": TIME_BUDGET}
+_deadline = None
+_stop_reason = None
+
+
+def configure(fail_fast=FAIL_FAST, link_max_failures=LINK_MAX_FAILURES, time_budget=TIME_BUDGET):
+    """Set the early-abort policies for the rest of the process."""
+    _settings.update(fail_fast=fail_fast, link_max_failures=link_max_failures, time_budget=time_budget)
+
+
+def link_max_failures():
+    """Return how many broken links a page may have before probing stops (None: no cap)."""
+    return _settings["link_max_failures"]
+
+
+def start():
+    """Start the run clock that the time budget is measured against."""
+    global _deadline, _stop_reason
+    budget = _settings["time_budget"]
+    with _lock:
+        _deadline = None if budget is None else time.monotonic() + budget
+        _stop_reason = None
+
+
+def stop(reason):
+    """Ask the run to stop; the first reason given is kept."""
+    global _stop_reason
+    with _lock:
+        if _stop_reason is not None:
+            return
+        _stop_reason = reason
+    print(f"Stopping early: {reason}")
+    events.emit("run_aborted", reason=reason)
+
+
+def stop_reason():
+    """Return why the run is stopping, or None while work should continue."""
+    if _stop_reason is None and _deadline is not None and time.monotonic() >= _deadline:
+        stop(f"time budget of {_settings['time_budget']}s exhausted")
+    return _stop_reason
+
+
+def stopped():
+    """Return the reason the run was stopped, without checking the time budget again."""
+    return _stop_reason
+
+
+def note_result(row):
+    """Apply fail-fast to a recorded result row."""
+    if _settings["fail_fast"] and row.get("Status") == "Fail":
+        stop(f"fail-fast: {row.get('Test Case', 'a check')} failed on {row.get('Page URL')}")
@@ -0,0 +1,92 @@
+from functools import partial
+from utils.incremental import reuse_or_run
+
+
+# Rules register themselves when their module is imported; the runner imports every
+# check module of a run before the first page is loaded (see utils.runner.import_checks),
+# so every page snapshot carries what every rule of the run reads
+
+
+class Rule:
+    """A page check, declared by the elements it reads and the function that reads them."""
+
+    def __init__(self, name, elements, function, reuse=True, reuse_options=None):
+        self.name = name
+        self.elements = dict(elements)
+        self.function = function
+        self.reuse = reuse
+        self.reuse_options = reuse_options or {}
+
+    @property
+    def inputs(self):
+        """Element keys the rule reads, e.g. for hashing with utils.incremental."""
+        return tuple(self.elements)
+
+    def run(self, snapshot):
+        """Call the rule on a snapshot, reusing its stored row while its inputs are unchanged."""
+        if not self.reuse:
+            return self.function(snapshot)
+        return reuse_or_run(snapshot, self.name, self.inputs, partial(self.function, snapshot), **self.reuse_options)
+
+
+RULES = {}
+
+
+def rule(name, elements, reuse=True, **reuse_options):
+    """
+    Register the decorated function as a rule that reads `elements`.
+
+    Args:
+        name (str): Unique rule name (e.g. 'H1 Tag Test').
+        elements (dict): Maps an element key to a (css_selector, [property names]) pair.
+            Rules reading the same elements use the same key and selector; their
+            properties are merged, so the elements are still extracted once.
+        reuse (bool): The rule returns a report row that may be reused from a
+            previous run while its elements are unchanged (see utils.incremental).
+        **reuse_options: Passed to `reuse_or_run`, e.g. reuse_failures=False.
+
+    The function is returned unchanged; it receives a PageSnapshot and returns
+    the rule's result.
+    """
+    def register(function):
+        RULES[name] = Rule(name, elements, function, reuse, reuse_options)
+        return function
+    return register
+
+
+def run_rules(snapshot, names):
+    """
+    Dispatch one snapshot to the named rules.
+
+    Returns:
+        dict: Rule name -> the rule's result (with *Reused* set on reusable rows).
+    """
+    return {name: RULES[name].run(snapshot) for name in names}
+
+
+def merged_elements(names=None):
+    """
+    Merge the element needs of the named rules (all rules by default) into one spec.
+
+    Returns:
+        dict: Element key -> (css_selector, [property names]), ready for one
+        extract_many call or one static parse.
+
+    Raises:
+        ValueError: If two rules use the same key for different selectors.
+    """
+    rules = list(RULES.values()) if names is None else [RULES[name] for name in names]
+    merged = {}
+    for page_rule in rules:
+        for key, (selector, properties) in page_rule.elements.items():
+            if key not in merged:
+                merged[key] = (selector, list(properties))
+                continue
+            known_selector, known_properties = merged[key]
+            if known_selector != selector:
+                raise ValueError(
+                    f"Element key {key!r} is declared as {known_selector!r} and {selector!r} "
+                    f"(rule {page_rule.name!r})"
+                )
+            known_properties.extend(name for name in properties if name not in known_properties)
+    return merged
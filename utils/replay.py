@@ -0,0 +1,218 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import partial
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from utils import browser
+from utils.config import HTTP_ARCHIVE_DIR, LINK_CHECK_WORKERS, LINK_CHECK_TIMEOUT
+from utils.link_checker import get_session
+
+
+# Headers that describe the transfer rather than the stored (decoded) body
+TRANSFER_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    reason TEXT,
+    headers TEXT NOT NULL,
+    body TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (method, url)
+)
+"""
+
+
+class Archive:
+    """
+    Recorded HTTP responses on disk.
+
+    Bodies are stored once per content hash under `bodies/`; `index.sqlite`
+    maps each (method, URL) to its status, headers and body hash.
+    """
+
+    def __init__(self, directory=HTTP_ARCHIVE_DIR):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self._conn.execute(INDEX_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _body_path(self, digest):
+        return os.path.join(self.directory, "bodies", digest[:2], digest)
+
+    def store(self, method, url, status, reason, headers, body):
+        """Archive one response; identical bodies share one file."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._body_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(body)
+        headers = {name: value for name, value in headers.items() if name.lower() not in TRANSFER_HEADERS}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (method, url, status, reason, headers, body, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (method.upper(), url, status, reason, json.dumps(headers), digest, time.time()),
+            )
+
+    def lookup(self, method, url):
+        """
+        Return the archived response for a request, or None.
+
+        A HEAD request is answered from a recorded GET when no HEAD was recorded.
+
+        Returns:
+            dict: status, reason, headers and body (bytes; empty for HEAD).
+        """
+        method = method.upper()
+        with self._lock:
+            row = None
+            for candidate in (method, "GET") if method == "HEAD" else (method,):
+                row = self._conn.execute(
+                    "SELECT status, reason, headers, body FROM responses WHERE method = ? AND url = ?",
+                    (candidate, url),
+                ).fetchone()
+                if row:
+                    break
+        if row is None:
+            return None
+        status, reason, headers, digest = row
+        body = b""
+        if method != "HEAD":
+            with open(self._body_path(digest), "rb") as f:
+                body = f.read()
+        return {"status": status, "reason": reason, "headers": json.loads(headers), "body": body}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ArchiveAdapter(HTTPAdapter):
+    """
+    A requests transport that records every response to an Archive, or replays
+    them from it without touching the network.
+
+    Each redirect hop is a separate request, so redirects replay exactly as recorded.
+    """
+
+    def __init__(self, archive, mode, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.mode = mode
+
+    def send(self, request, **kwargs):
+        if self.mode == "replay":
+            entry = self.archive.lookup(request.method, request.url)
+            if entry is None:
+                raise requests.exceptions.ConnectionError(f"Not in the HTTP archive: {request.method} {request.url}")
+            return self._replayed(request, entry)
+
+        response = super().send(request, **kwargs)
+        # Reading the body here also covers streamed requests; it is kept on the response
+        self.archive.store(
+            request.method, request.url, response.status_code, response.reason, response.headers, response.content,
+        )
+        return response
+
+    @staticmethod
+    def _replayed(request, entry):
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry["body"]
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def intercept_requests(driver, session, mode):
+    """
+    Serve a browser's requests through an archive session with WebDriver BiDi
+    network interception, so HTTPS pages and remote browsers are covered too.
+
+    While recording, only GET and HEAD requests are fetched by the session; the
+    browser does not expose other request bodies, so those go out unrecorded.
+    While replaying, every request is answered from the archive or failed.
+    """
+    def handle(request):
+        if mode == "record" and request.method not in ("GET", "HEAD"):
+            return  # Continued by the browser itself
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in TRANSFER_HEADERS}
+        if request.cookies and not any(name.lower() == "cookie" for name in headers):
+            headers["Cookie"] = "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in request.cookies)
+        try:
+            response = session.request(
+                request.method, request.url, headers=headers, allow_redirects=False, timeout=LINK_CHECK_TIMEOUT,
+            )
+        except requests.exceptions.RequestException:
+            request.fail()
+            return
+
+        content = response.content if request.method != "HEAD" else b""
+        request.provide_response(
+            status=response.status_code,
+            reason_phrase=response.reason or "",
+            headers={name: value for name, value in response.headers.items() if name.lower() not in TRANSFER_HEADERS},
+            body={"type": "base64", "value": base64.b64encode(content).decode("ascii")},
+        )
+
+    driver.network.add_request_handler(handle)
+
+
+_archive = None
+
+
+def use_archive(mode, directory=HTTP_ARCHIVE_DIR):
+    """
+    Route link probes, static page fetches and the browser through the HTTP archive.
+
+    Args:
+        mode (str): 'record' to fetch live and archive every response, 'replay'
+            to answer only from the archive, or None to go back to the live network.
+        directory (str): The archive directory.
+    """
+    global _archive
+    stop_archive()
+    if mode is None:
+        return
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Unknown archive mode {mode!r}; use 'record' or 'replay'")
+
+    _archive = Archive(directory)
+    adapter = ArchiveAdapter(_archive, mode, pool_connections=LINK_CHECK_WORKERS, pool_maxsize=LINK_CHECK_WORKERS)
+    get_session().mount("http://", adapter)
+    get_session().mount("https://", adapter)
+
+    # Browsers get their own session so page loads are not limited by the link-check pool
+    browser_session = requests.Session()
+    browser_adapter = ArchiveAdapter(_archive, mode, pool_connections=LINK_CHECK_WORKERS, pool_maxsize=LINK_CHECK_WORKERS)
+    browser_session.mount("http://", browser_adapter)
+    browser_session.mount("https://", browser_adapter)
+    browser.set_interceptor(partial(intercept_requests, session=browser_session, mode=mode))
+    print(f"HTTP archive: {mode} mode, {directory}")
+
+
+def stop_archive():
+    """Send link probes, page fetches and new browsers to the live network again."""
+    global _archive
+    if _archive is not None:
+        browser.set_interceptor(None)
+        adapter = HTTPAdapter(pool_connections=LINK_CHECK_WORKERS, pool_maxsize=LINK_CHECK_WORKERS)
+        get_session().mount("http://", adapter)
+        get_session().mount("https://", adapter)
+        _archive.close()
+        _archive = None
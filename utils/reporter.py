@@ -1,30 +1,226 @@
+import argparse
+import json
 import os
-import pandas as pd
-from utils.config import EXCEL_OUTPUT
-
-
-def initialize_report():
-    """Initialize an empty DataFrame for the test results."""
-    columns = ["Page URL", "Test Case", "Status", "Comments"]
-    return pd.DataFrame(columns=columns)
-
-
-def save_report(dataframe, sheet_name):
-    """Save test results to an Excel file, appending to an existing sheet if necessary."""
-    if os.path.exists(EXCEL_OUTPUT):
-        # Load the existing workbook and check for the sheet
-        with pd.ExcelWriter(EXCEL_OUTPUT, mode="a", engine="openpyxl", if_sheet_exists="overlay") as writer:
-            try:
-                # Load existing data if the sheet exists
-                existing_data = pd.read_excel(EXCEL_OUTPUT, sheet_name=sheet_name)
-                # Append the new data to the existing data
-                updated_data = pd.concat([existing_data, dataframe], ignore_index=True)
-                updated_data.to_excel(writer, index=False, sheet_name=sheet_name)
-            except ValueError:
-                # Sheet does not exist, so create it
-                dataframe.to_excel(writer, index=False, sheet_name=sheet_name)
-    else:
-        # Create a new Excel file with the given sheet
-        with pd.ExcelWriter(EXCEL_OUTPUT, engine="openpyxl") as writer:
-            dataframe.to_excel(writer, index=False, sheet_name=sheet_name)
-    print(f"Report saved to {EXCEL_OUTPUT} in sheet '{sheet_name}'")
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from utils import events, policy, tracing
+from utils.config import EXCEL_OUTPUT, RESULTS_DB
+
+
+# Columns stored natively; any other key of a result row is kept in `data` as JSON
+COLUMNS = {
+    "Page URL": "page_url",
+    "Test Case": "test_case",
+    "Status": "status",
+    "Comments": "comments",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    page_url TEXT,
+    test_case TEXT,
+    status TEXT,
+    duration REAL,
+    comments TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS results_case ON results (test_case, page_url);
+"""
+
+
+def _new_run_id():
+    return datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+
+# Identifies every row written by this run (see `new_run` for long-lived processes)
+RUN_ID = _new_run_id()
+
+# Result rows waiting to be written to the store
+_pending = []
+_pending_lock = threading.Lock()
+# Serializes store writes so only one writer touches the database at a time
+_writer_lock = threading.Lock()
+_check = threading.local()
+
+
+def new_run():
+    """Start a new run id, e.g. for each run served by a persistent process, and return it."""
+    global RUN_ID
+    RUN_ID = _new_run_id()
+    return RUN_ID
+
+
+@contextmanager
+def timed_check():
+    """Attach the elapsed time of the enclosed check to the rows it records."""
+    _check.start = time.perf_counter()
+    try:
+        yield
+    finally:
+        del _check.start
+
+
+def record_result(rows, sheet_name, duration=None):
+    """
+    Buffer result rows for a sheet; nothing is written until `flush_report`.
+
+    Args:
+        rows (dict or list): A single result row or a list of rows.
+        sheet_name (str): Name of the sheet the rows belong to.
+        duration (float): Seconds the check took; defaults to the time since
+            the enclosing `timed_check` started.
+    """
+    if isinstance(rows, dict):
+        rows = [rows]
+    if duration is None and hasattr(_check, "start"):
+        duration = time.perf_counter() - _check.start
+
+    # Rows recorded inside a traced check carry its timing breakdown as extra columns
+    timings = tracing.check_metrics() if tracing.current_check() else {}
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    entries = [(sheet_name, timestamp, duration, {**row, **timings}) for row in rows]
+    with _pending_lock:
+        _pending.extend(entries)
+
+    # Results are streamed as soon as they are known, long before the store is written
+    for row in rows:
+        events.emit(
+            "result", sheet=sheet_name, check=tracing.current_check(),
+            duration=None if duration is None else round(duration, 3), row=row,
+        )
+        policy.note_result(row)
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def flush_report(path=RESULTS_DB):
+    """Append all buffered rows to the results store in one transaction."""
+    with _pending_lock:
+        pending = list(_pending)
+        _pending.clear()
+    if not pending:
+        return
+
+    records = []
+    for sheet, timestamp, duration, row in pending:
+        native = {column: row.pop(key, None) for key, column in COLUMNS.items()}
+        records.append((
+            RUN_ID, timestamp, sheet, native["page_url"], native["test_case"], native["status"],
+            None if duration is None else round(duration, 3), native["comments"],
+            json.dumps(row, ensure_ascii=False, default=str) if row else None,
+        ))
+
+    with _writer_lock, tracing.span("flush_report", "report"):
+        conn = _connect(path)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO results (run_id, timestamp, sheet, page_url, test_case, status, duration, comments, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    records,
+                )
+        finally:
+            conn.close()
+    print(f"Saved {len(records)} result rows to {path} (run {RUN_ID})")
+
+
+def load_results(run_id=None, path=RESULTS_DB):
+    """
+    Read result rows back from the store.
+
+    Args:
+        run_id (str): Only return rows of this run; all runs when None.
+        path (str): Path of the results store.
+
+    Returns:
+        list: One dictionary per row, with the extra `data` columns merged in.
+    """
+    if not os.path.exists(path):
+        return []
+    conn = _connect(path)
+    try:
+        query = "SELECT run_id, timestamp, sheet, page_url, test_case, status, duration, comments, data FROM results"
+        params = ()
+        if run_id:
+            query += " WHERE run_id = ?"
+            params = (run_id,)
+        rows = conn.execute(query + " ORDER BY id", params).fetchall()
+    finally:
+        conn.close()
+
+    results = []
+    for run, timestamp, sheet, page_url, test_case, status, duration, comments, data in rows:
+        row = {
+            "Sheet": sheet,
+            "Run ID": run,
+            "Timestamp": timestamp,
+            "Test Case": test_case,
+            "Status": status,
+            "Page URL": page_url,
+            "Duration (s)": duration,
+            "Comments": comments,
+        }
+        row.update(json.loads(data) if data else {})
+        results.append(row)
+    return results
+
+
+def export_excel(output=EXCEL_OUTPUT, run_id=None, path=RESULTS_DB):
+    """Generate the Excel report from the results store, one sheet per test."""
+    sheets = {}
+    for row in load_results(run_id, path):
+        sheets.setdefault(row.pop("Sheet"), []).append(row)
+    if not sheets:
+        print(f"No results found in {path}")
+        return
+
+    # pandas (and numpy/openpyxl) load only when a workbook is actually written
+    import pandas as pd
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet, rows in sheets.items():
+            # Drop columns a sheet never uses (e.g. Status on Script Data)
+            pd.DataFrame(rows).dropna(axis=1, how="all").to_excel(writer, index=False, sheet_name=sheet)
+    print(f"Report exported to {output} ({len(sheets)} sheets)")
+
+
+def import_excel(workbook, path=RESULTS_DB):
+    """Load the rows of a workbook written before the results store existed."""
+    import pandas as pd
+
+    for sheet, frame in pd.read_excel(workbook, sheet_name=None).items():
+        frame = frame.astype(object).where(frame.notna(), None)
+        record_result(frame.to_dict("records"), sheet_name=sheet)
+    flush_report(path)
+
+
+def main():
+    """Export the results store to Excel from the command line."""
+    parser = argparse.ArgumentParser(description="Export stored test results to Excel.")
+    parser.add_argument("--run", help="Only export rows of this run id.")
+    parser.add_argument("--output", default=EXCEL_OUTPUT, help=f"Workbook to write (default: {EXCEL_OUTPUT}).")
+    parser.add_argument("--import", dest="legacy", metavar="WORKBOOK",
+                        help="Load an existing workbook into the store before exporting.")
+    args = parser.parse_args()
+    if args.legacy:
+        import_excel(args.legacy)
+    export_excel(args.output, run_id=args.run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import importlib
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from utils import events, policy, tracing
+from utils.browser import configure_pool, get_pool
+from utils.config import RUNNER_WORKERS, DRIVER_POOL_SIZE, DRIVER_MAX_USES, GRID_RETRIES
+from utils.reporter import timed_check
+
+
+# perf_counter() time at which the first check of the current run started
+_first_check = None
+_first_check_lock = threading.Lock()
+
+
+def first_check_started():
+    """Return when the first check of the current run started, or None."""
+    return _first_check
+
+
+def reset_first_check():
+    """Forget the first check's start time, e.g. before each run of a long-lived process."""
+    global _first_check
+    with _first_check_lock:
+        _first_check = None
+
+
+def _mark_first_check(start):
+    global _first_check
+    with _first_check_lock:
+        if _first_check is None:
+            _first_check = start
+
+
+def _node_failed(check_name):
+    """Return True if the check lost its browser to a failed grid node (see utils.grid)."""
+    take_failure = getattr(get_pool(), "take_failure", None)
+    return take_failure is not None and take_failure(check_name)
+
+
+def import_checks(checks):
+    """
+    Import every check module of a run before any page is loaded, so the rules they
+    register (see utils.registry) are all merged into the first page snapshot.
+
+    Modules that fail to import are left for `run_check` to report.
+    """
+    for module_name, _ in checks:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            pass
+
+
+def run_check(module_name, function_name, *args):
+    """
+    Import a test module and call its entry function, isolating any failure.
+    A check whose grid node fails under it is retried up to GRID_RETRIES times.
+
+    Args:
+        module_name (str): The module to import (e.g., 'tests.test_h1_tag').
+        function_name (str): The entry function to call (e.g., 'test_h1_tag').
+        *args: Passed on to the entry function (e.g., the page URL).
+
+    Returns:
+        dict: Structured result with the module, status ('ok', 'error' or
+        'skipped'), duration, timing breakdown (see utils.tracing.TIMING_COLUMNS)
+        and error.
+    """
+    check_name = " ".join([module_name, *map(str, args)])
+    tracing.reset_metrics(check_name)
+
+    # Once a policy stops the run, checks that have not started are skipped
+    reason = policy.stop_reason()
+    if reason:
+        events.emit("check_skipped", check=check_name, reason=reason)
+        return {
+            "module": module_name,
+            "function": function_name,
+            "args": args,
+            "status": "skipped",
+            "duration": 0.0,
+            "timings": tracing.check_metrics(check_name),
+            "error": reason,
+        }
+
+    print(f"\nRunning {module_name}...")
+    events.emit("check_start", check=check_name)
+    start = time.perf_counter()
+    _mark_first_check(start)
+    error = None
+    for attempt in range(GRID_RETRIES + 1):
+        try:
+            module = importlib.import_module(module_name)
+            with timed_check(), tracing.use_check(check_name):
+                getattr(module, function_name)(*args)
+            error = None
+            break
+        except (Exception, SystemExit) as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < GRID_RETRIES and _node_failed(check_name):
+                print(f"{module_name} lost its grid node ({error}); retrying on another node...")
+                continue
+            print(f"Error while running {module_name}: {error}")
+            traceback.print_exc()
+            break
+
+    result = {
+        "module": module_name,
+        "function": function_name,
+        "args": args,
+        "status": "error" if error else "ok",
+        "duration": round(time.perf_counter() - start, 3),
+        "timings": tracing.check_metrics(check_name),
+        "error": error,
+    }
+    events.emit("check_end", check=check_name, status=result["status"], duration=result["duration"], error=error)
+    if error:
+        policy.note_result({"Status": "Fail", "Test Case": module_name, "Page URL": args[0] if args else None})
+    return result
+
+
+def run_checks(checks, workers=RUNNER_WORKERS):
+    """
+    Run test entry functions concurrently, each worker with its own browser.
+
+    Args:
+        checks (list): (module_name, function_name) pairs to run.
+        workers (int): Number of checks to run at the same time.
+
+    Returns:
+        list: One result dictionary per check, in the order given.
+    """
+    workers = max(1, workers)
+    # At least one browser per worker so checks never wait on each other for a driver;
+    # any extra browsers are shared by checks that fan out (e.g. the currency matrix)
+    configure_pool(size=max(workers, DRIVER_POOL_SIZE), max_uses=DRIVER_MAX_USES)
+    import_checks(checks)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="check") as executor:
+        futures = [executor.submit(run_check, module, function) for module, function in checks]
+        return [future.result() for future in futures]
@@ -0,0 +1,242 @@
+import json
+import os
+import re
+import threading
+from requests.exceptions import RequestException
+from selenium.common.exceptions import TimeoutException
+from utils.browser import ALL_RESOURCES, borrow_driver, cache_disabled, extract_many, iter_extract, read_performance
+from utils.config import (
+    SNAPSHOT_DIR, SAVE_SNAPSHOTS, SNAPSHOT_PAGE_SOURCE, PAGE_ENGINE, STATIC_REQUIRED_ELEMENTS, PERFORMANCE_SHARED_LOAD, PERFORMANCE_COLD_CACHE,
+)
+from utils.registry import merged_elements
+from utils.static_page import fetch_html, parse_html, missing_elements
+from utils.waits import wait_until_all
+
+
+# Element groups a PageSnapshot exposes as named fields; rules reading them declare these specs
+HEADER_ELEMENTS = ("h1, h2, h3, h4, h5, h6", ["tagName"])
+IMAGE_ELEMENTS = ("img", ["src", "alt"])
+LINK_ELEMENTS = ("a", ["href"])
+SCRIPT_ELEMENTS = ("script", ["innerHTML"])
+
+# The whole document, only captured when asked for (SNAPSHOT_PAGE_SOURCE); it grows with the page
+PAGE_SOURCE_ELEMENTS = {"page_source": ("html", ["outerHTML"])}
+
+
+def snapshot_elements(page_source=SNAPSHOT_PAGE_SOURCE):
+    """Everything the registered rules read, optionally with the page source, for one traversal per page."""
+    return {**(PAGE_SOURCE_ELEMENTS if page_source else {}), **merged_elements()}
+
+# The static checks only read the DOM, so images, fonts, media and trackers can be blocked
+SNAPSHOT_RESOURCES = ()
+
+
+class PageSnapshot:
+    """
+    The rendered state of a page, captured once and shared by the static checks.
+
+    Only what the checks read is kept: unique links, and only the images that
+    lack alt text, so a snapshot does not grow with repeated links or with images
+    that pass. `counts` holds how many elements each element key matched.
+    """
+
+    FIELDS = ("url", "page_source", "headers", "images", "links", "scripts", "elements", "engine",
+              "performance", "counts")
+
+    def __init__(self, url, page_source="", headers=None, images=None, links=None, scripts=None, elements=None,
+                 engine=None, performance=None, counts=None):
+        self.url = url
+        self.engine = engine or "browser"  # "browser" (rendered by Chrome) or "static" (parsed HTML)
+        self.page_source = page_source
+        self.headers = headers or []  # Tag names in document order, e.g. ["h1", "h2"]
+        self.images = images or []  # {"src": ..., "alt": ...} per <img> without alt text
+        self.links = links or []  # Each resolved href once, in document order; empty when missing
+        self.scripts = scripts or []  # innerHTML per <script>
+        self.elements = elements or {}  # Rows of any other element key a rule declared, e.g. "prices"
+        self.performance = performance  # Timing entries of the load (see read_performance), when measured
+        self.counts = counts or {}  # Elements matched per element key, e.g. {"images": 120}
+        self.unsupported = []  # Element keys the static engine could not match
+
+    @classmethod
+    def from_chunks(cls, url, chunks, engine=None):
+        """
+        Build a snapshot from (key, total, rows) chunks of extracted elements (see
+        utils.browser.iter_extract), dropping the rows of each chunk once read.
+        """
+        snapshot = cls(url=url, engine=engine)
+        links = {}  # Ordered set of hrefs
+        for key, total, rows in chunks:
+            snapshot.counts[key] = total
+            if key == "page_source":
+                snapshot.page_source = rows[0]["outerHTML"] if rows else ""
+            elif key == "headers":
+                snapshot.headers.extend(row["tagName"].lower() for row in rows)
+            elif key == "images":
+                snapshot.images.extend(row for row in rows if not row["alt"])
+            elif key == "links":
+                links.update(dict.fromkeys(row["href"] for row in rows))
+            elif key == "scripts":
+                snapshot.scripts.extend(row["innerHTML"] or "" for row in rows)
+            else:
+                snapshot.elements.setdefault(key, []).extend(rows)
+        snapshot.links = list(links)
+        return snapshot
+
+    @classmethod
+    def from_elements(cls, url, elements, engine=None):
+        """Build a snapshot from extracted element rows (see utils.registry)."""
+        return cls.from_chunks(url, ((key, len(rows), rows) for key, rows in elements.items()), engine)
+
+    def get(self, key):
+        """Return a named field or the rows of any other element key."""
+        return getattr(self, key) if key in self.FIELDS else self.elements.get(key, [])
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls.FIELDS})
+
+
+def capture_snapshot(driver, url, measure=False, page_source=SNAPSHOT_PAGE_SOURCE):
+    """
+    Load a URL once and capture its rendered DOM data.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        url (str): The page to load.
+        measure (bool): Also wait for the load event and keep the page's timing
+            entries, for the performance check.
+        page_source (bool): Also keep the rendered HTML of the whole page.
+
+    Returns:
+        PageSnapshot: The captured page.
+    """
+    with cache_disabled(driver, measure and PERFORMANCE_COLD_CACHE):
+        driver.get(url)
+        try:
+            # Resolves as soon as headers or images are in the DOM
+            wait_until_all(driver, "h1, h2, h3, h4, h5, h6, img", key="page_content")
+        except TimeoutException as e:
+            print(f"Timeout: {e} Capturing the page as-is.")
+
+        # Every registered rule's elements, read by one injected script and kept a chunk at a time
+        snapshot = PageSnapshot.from_chunks(url, iter_extract(driver, snapshot_elements(page_source)), engine="browser")
+        if measure:
+            try:
+                snapshot.performance = read_performance(driver)
+            except TimeoutException as e:
+                print(f"Timeout: {e} {url} did not finish loading; it is not measured.")
+    return snapshot
+
+
+def collect_elements(driver, rule_names, url=None):
+    """
+    Read only the elements the named rules declare from the driver's current page,
+    in one round-trip (e.g. the prices again after switching currency).
+    """
+    return PageSnapshot.from_elements(url, extract_many(driver, merged_elements(rule_names)), engine="browser")
+
+
+def capture_static_snapshot(url, page_source=SNAPSHOT_PAGE_SOURCE):
+    """
+    Fetch a URL over HTTP and parse its HTML without a browser.
+
+    Returns:
+        PageSnapshot: The parsed page; scripts are not executed.
+    """
+    html, final_url = fetch_html(url)
+    rows, unsupported = parse_html(html, final_url, snapshot_elements(page_source))
+    snapshot = PageSnapshot.from_elements(url, rows, engine="static")
+    snapshot.unsupported = unsupported
+    return snapshot
+
+
+def load_page(url, engine=PAGE_ENGINE, page_source=SNAPSHOT_PAGE_SOURCE):
+    """
+    Capture a snapshot with the configured engine.
+
+    In 'auto' mode the page is parsed statically first, and Chrome is only
+    used when the fetch fails or the HTML lacks STATIC_REQUIRED_ELEMENTS
+    (e.g. content rendered by JavaScript). With PERFORMANCE_SHARED_LOAD every
+    page is loaded in Chrome with all resources and measured.
+    """
+    if PERFORMANCE_SHARED_LOAD:
+        with borrow_driver(needs=ALL_RESOURCES) as driver:
+            return capture_snapshot(driver, url, measure=True, page_source=page_source)
+
+    if engine in ("static", "auto"):
+        try:
+            snapshot = capture_static_snapshot(url, page_source)
+        except (RequestException, OSError) as e:
+            if engine == "static":
+                raise
+            print(f"Static fetch of {url} failed ({e}); using the browser.")
+        else:
+            # Rules whose selectors the static engine cannot match need the browser too
+            missing = missing_elements(snapshot.counts, STATIC_REQUIRED_ELEMENTS) + snapshot.unsupported
+            if engine == "static" or not missing:
+                return snapshot
+            print(f"Static HTML of {url} has no {', '.join(missing)}; using the browser.")
+
+    with borrow_driver(needs=SNAPSHOT_RESOURCES) as driver:
+        return capture_snapshot(driver, url, page_source=page_source)
+
+
+def snapshot_path(url):
+    """Return the file a snapshot of the given URL is saved to."""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", url).strip("_")
+    return os.path.join(SNAPSHOT_DIR, f"{name}.json")
+
+
+def save_snapshot(snapshot, path=None):
+    """Write a snapshot to disk as JSON so it can be re-checked offline."""
+    path = path or snapshot_path(snapshot.url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot.to_dict(), f, ensure_ascii=False)
+    return path
+
+
+def load_snapshot(path):
+    """Read a snapshot previously written by `save_snapshot`."""
+    with open(path, encoding="utf-8") as f:
+        return PageSnapshot.from_dict(json.load(f))
+
+
+_snapshots = {}
+_url_locks = {}
+_cache_lock = threading.Lock()
+
+
+def get_snapshot(url):
+    """
+    Return the snapshot for a URL, loading the page only on first request.
+
+    Concurrent callers asking for the same URL wait for a single page load.
+    """
+    with _cache_lock:
+        url_lock = _url_locks.setdefault(url, threading.Lock())
+
+    with url_lock:
+        if url not in _snapshots:
+            snapshot = load_page(url)
+            if SAVE_SNAPSHOTS:
+                save_snapshot(snapshot)
+            _snapshots[url] = snapshot
+        return _snapshots[url]
+
+
+def discard_snapshot(url):
+    """Drop the cached snapshot of a URL once every check on it has finished."""
+    with _cache_lock:
+        _snapshots.pop(url, None)
+        _url_locks.pop(url, None)
+
+
+def clear_snapshots():
+    """Forget all cached snapshots so the next request reloads the page."""
+    with _cache_lock:
+        _snapshots.clear()
+        _url_locks.clear()
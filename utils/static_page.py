@@ -0,0 +1,221 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from urllib.request import url2pathname
+from requests.exceptions import RequestException
+from utils import tracing
+from utils.config import LINK_CHECK_TIMEOUT
+from utils.link_checker import get_session
+
+
+# Browser properties that resolve to absolute URLs (an element without the attribute reads "")
+URL_PROPERTIES = {"href", "src", "action"}
+# Properties read from an element's text; innerHTML is only exact for <script> and <style>
+TEXT_PROPERTIES = {"innerText", "textContent", "innerHTML"}
+# Elements that never have an end tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+}
+
+SELECTOR_PART = re.compile(r"""([#.])([\w-]+)|\[([\w-]+)(?:=["']?([^"'\]]*)["']?)?\]""")
+SELECTOR_TAG = re.compile(r"\*|[A-Za-z][\w-]*")
+
+
+class UnsupportedSelector(ValueError):
+    """Raised for selectors the static engine cannot match (combinators, pseudo-classes)."""
+
+
+class SimpleSelector:
+    """One compound selector such as 'img', '.js-price-value' or 'a[href]'."""
+
+    def __init__(self, text):
+        self.tag = None
+        self.ids = []
+        self.classes = []
+        self.attributes = []
+
+        tag = SELECTOR_TAG.match(text)
+        position = 0
+        if tag:
+            self.tag = None if tag.group() == "*" else tag.group().lower()
+            position = tag.end()
+        while position < len(text):
+            part = SELECTOR_PART.match(text, position)
+            if not part:
+                raise UnsupportedSelector(f"Static engine cannot match selector {text!r}")
+            kind, name, attribute, value = part.groups()
+            if kind == "#":
+                self.ids.append(name)
+            elif kind == ".":
+                self.classes.append(name)
+            else:
+                self.attributes.append((attribute.lower(), value))
+            position = part.end()
+
+    def matches(self, tag, attrs):
+        if self.tag is not None and tag != self.tag:
+            return False
+        if any(attrs.get("id") != id_ for id_ in self.ids):
+            return False
+        classes = (attrs.get("class") or "").split()
+        if any(name not in classes for name in self.classes):
+            return False
+        return all(
+            name in attrs and (value is None or attrs[name] == value) for name, value in self.attributes
+        )
+
+
+def compile_selector(selector):
+    """Split a selector list ('h1, h2, img.big') into SimpleSelectors."""
+    return [SimpleSelector(part.strip()) for part in selector.split(",")]
+
+
+class PageParser(HTMLParser):
+    """
+    Collects the elements requested by the page rules from raw HTML in one pass.
+
+    Produces the same rows as BULK_EXTRACT_SCRIPT in the browser: one
+    {property: value} dictionary per matching element, under each element key.
+    """
+
+    def __init__(self, url, elements):
+        super().__init__(convert_charrefs=True)
+        self.base_url = url
+        self.rows = {}
+        self.unsupported = []
+        self.targets = []
+        for key, (selector, names) in elements.items():
+            try:
+                self.targets.append((key, compile_selector(selector), names))
+                self.rows[key] = []
+            except UnsupportedSelector:
+                self.unsupported.append(key)
+        self._open = []  # (tag, rows waiting for their text, text parts) per open matching element
+        self._by_tag = {}  # Tag name -> the targets that can match it, filled as tags are seen
+
+    def _targets_for(self, tag):
+        if tag not in self._by_tag:
+            self._by_tag[tag] = [
+                (key, [selector for selector in selectors if selector.tag in (None, tag)], names)
+                for key, selectors, names in self.targets
+                if any(selector.tag in (None, tag) for selector in selectors)
+            ]
+        return self._by_tag[tag]
+
+    def _read(self, tag, attrs, name):
+        if name == "tagName":
+            return tag.upper()
+        if name in URL_PROPERTIES:
+            # Resolve like the browser's property; elements without the attribute read empty
+            value = attrs.get(name)
+            return urljoin(self.base_url, value.strip()) if value is not None else ""
+        if name in TEXT_PROPERTIES:
+            return ""  # Filled in at the end tag
+        return attrs.get(name.lower())
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "base" and attrs.get("href") and not any(self.rows.values()):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+
+        waiting = []
+        for key, selectors, names in self._targets_for(tag):
+            if any(selector.matches(tag, attrs) for selector in selectors):
+                row = {name: self._read(tag, attrs, name) for name in names}
+                self.rows[key].append(row)
+                if TEXT_PROPERTIES.intersection(names):
+                    waiting.append(row)
+        if waiting and tag not in VOID_ELEMENTS:
+            self._open.append((tag, waiting, []))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_data(self, data):
+        for _, _, parts in self._open:
+            parts.append(data)
+
+    def handle_endtag(self, tag):
+        # Close the innermost open element with this tag, and any left unclosed inside it
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index][0] == tag:
+                while len(self._open) > index:
+                    self._finish(*self._open.pop())
+                return
+
+    def close(self):
+        super().close()
+        while self._open:
+            self._finish(*self._open.pop())
+
+    @staticmethod
+    def _finish(tag, rows, parts):
+        text = "".join(parts)
+        for row in rows:
+            for name in TEXT_PROPERTIES.intersection(row):
+                row[name] = text
+
+
+def parse_html(html, url, elements):
+    """
+    Parse page HTML into element rows, as the browser engine would extract them.
+
+    Args:
+        html (str): The page source.
+        url (str): The page URL, used to resolve relative links and image sources.
+        elements (dict): Maps an element key to a (css_selector, [property names]) pair.
+
+    Returns:
+        dict: Element key -> list of {property: value} rows; a 'page_source'
+        key, when asked for, holds the HTML itself.
+        list: Element keys whose selectors the static engine cannot match.
+    """
+    parser = PageParser(url, {key: spec for key, spec in elements.items() if key != "page_source"})
+    parser.feed(html)
+    parser.close()
+    rows = dict(parser.rows)
+    if "page_source" in elements:
+        rows["page_source"] = [{"outerHTML": html}]
+    return rows, parser.unsupported
+
+
+# Content types parsed by the static engine; a response without one is assumed to be HTML
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class NotHTML(RequestException):
+    """Raised when a fetched page is not HTML (e.g. a PDF or an image)."""
+
+
+def fetch_html(url, timeout=LINK_CHECK_TIMEOUT):
+    """
+    Fetch a page's HTML over HTTP, or read it from a file:// URL.
+
+    Returns:
+        str: The page HTML.
+        str: The final URL after redirects.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails, or NotHTML if the response is not HTML.
+        OSError: If a file:// URL cannot be read.
+    """
+    if url.startswith("file://"):
+        with open(url2pathname(url[len("file://"):]), encoding="utf-8") as f:
+            return f.read(), url
+
+    with tracing.span("GET", "http"):
+        # Streamed so the body of a non-HTML response is never downloaded
+        response = get_session().get(url, timeout=timeout, stream=True)
+    with response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in HTML_CONTENT_TYPES:
+            raise NotHTML(f"{url} is {content_type}, not HTML", response=response)
+        return response.text, response.url
+
+
+def missing_elements(counts, required):
+    """Return the required element groups the parsed page has none of, given the elements matched per key."""
+    return [name for name in required if not counts.get(name)]
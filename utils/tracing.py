@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Per-check totals: {check: {category: [count, seconds]}}
+_metrics = {}
+# Individual spans, only kept while a Chrome trace is being recorded
+_events = None
+_lock = threading.Lock()
+_local = threading.local()
+_origin = time.perf_counter()
+
+# Report columns derived from the per-check totals
+TIMING_COLUMNS = {
+    "Browser Start (s)": ("seconds", ("driver_start",)),
+    "Page Load (s)": ("seconds", ("page_load",)),
+    "Wait (s)": ("seconds", ("wait",)),
+    "WebDriver Commands": ("count", ("page_load", "webdriver")),
+    "WebDriver Time (s)": ("seconds", ("page_load", "webdriver")),
+    "HTTP Requests": ("count", ("http",)),
+    "HTTP Time (s)": ("seconds", ("http",)),
+}
+
+
+def current_check():
+    """Return the name of the check running on this thread, if any."""
+    return getattr(_local, "check", None)
+
+
+@contextmanager
+def use_check(name):
+    """Attribute every span recorded on this thread inside the block to a check."""
+    previous = current_check()
+    _local.check = name
+    try:
+        yield
+    finally:
+        _local.check = previous
+
+
+def bind_check(function):
+    """Wrap a function so it records spans for the current check when run on another thread."""
+    check = current_check()
+
+    def bound(*args, **kwargs):
+        with use_check(check):
+            return function(*args, **kwargs)
+
+    return bound
+
+
+def record(name, category, start, end, check=None):
+    """Add a finished span, given as perf_counter timestamps, to the totals."""
+    check = check or current_check()
+    with _lock:
+        if check:
+            totals = _metrics.setdefault(check, {}).setdefault(category, [0, 0.0])
+            totals[0] += 1
+            totals[1] += end - start
+        if _events is not None:
+            _events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - _origin) * 1e6),
+                "dur": round((end - start) * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"check": check},
+            })
+
+
+@contextmanager
+def span(name, category):
+    """Time the enclosed block as a span of the given category."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, category, start, time.perf_counter())
+
+
+def check_metrics(check=None):
+    """Return the timing columns for a check (the current one by default)."""
+    with _lock:
+        totals = {category: list(values) for category, values in _metrics.get(check or current_check(), {}).items()}
+
+    columns = {}
+    for column, (kind, categories) in TIMING_COLUMNS.items():
+        if kind == "count":
+            columns[column] = sum(totals.get(category, [0, 0.0])[0] for category in categories)
+        else:
+            columns[column] = round(sum(totals.get(category, [0, 0.0])[1] for category in categories), 3)
+    return columns
+
+
+def reset_metrics(check):
+    """Forget the totals of a check before it runs again."""
+    with _lock:
+        _metrics.pop(check, None)
+
+
+def enable_trace():
+    """Start keeping individual spans for `write_trace`."""
+    global _events
+    with _lock:
+        _events = []
+
+
+def write_trace(path):
+    """Write the recorded spans as a Chrome trace-format JSON file (chrome://tracing, Perfetto)."""
+    with _lock:
+        events = list(_events or [])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print(f"Trace with {len(events)} spans written to {path}")
@@ -0,0 +1,130 @@
+import atexit
+import json
+import os
+import threading
+import time
+from selenium.common.exceptions import TimeoutException
+from utils import tracing
+from utils.config import (
+    WAIT_TIME, WAIT_HISTORY, WAIT_HISTORY_SIZE, WAIT_TIMEOUT_FACTOR, WAIT_TIME_MIN, WAIT_TIME_MAX,
+)
+
+
+# Resolves as soon as every element matching the selector satisfies the condition,
+# re-checking on DOM mutations instead of polling on a fixed interval
+WAIT_SCRIPT = """
+const [selector, conditionName, arg, timeoutMs, done] = arguments;
+const conditions = {
+    present: () => true,
+    text_contains: el => (el.innerText || el.textContent || "").includes(arg),
+};
+const condition = conditions[conditionName];
+const holds = () => {
+    if (document.readyState === "loading") return false;
+    const elements = document.querySelectorAll(selector);
+    return elements.length > 0 && Array.from(elements).every(condition);
+};
+if (holds()) {
+    done(true);
+} else {
+    let timer;
+    const observer = new MutationObserver(() => {
+        if (holds()) {
+            observer.disconnect();
+            clearTimeout(timer);
+            done(true);
+        }
+    });
+    observer.observe(document, {childList: true, subtree: true, characterData: true, attributes: true});
+    timer = setTimeout(() => {
+        observer.disconnect();
+        done(holds());
+    }, timeoutMs);
+}
+"""
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def _load_history():
+    global _history
+    if _history is None:
+        try:
+            with open(WAIT_HISTORY, encoding="utf-8") as f:
+                _history = json.load(f)
+        except (OSError, ValueError):
+            _history = {}
+    return _history
+
+
+def save_history():
+    """Write the remembered wait durations to WAIT_HISTORY."""
+    with _history_lock:
+        if not _history:
+            return
+        os.makedirs(os.path.dirname(WAIT_HISTORY) or ".", exist_ok=True)
+        with open(WAIT_HISTORY, "w", encoding="utf-8") as f:
+            json.dump(_history, f)
+
+
+atexit.register(save_history)
+
+
+def record_wait(key, seconds):
+    """Remember how long a wait took so future timeouts can adapt to it."""
+    with _history_lock:
+        durations = _load_history().setdefault(key, [])
+        durations.append(round(seconds, 3))
+        del durations[:-WAIT_HISTORY_SIZE]
+
+
+def adaptive_timeout(key):
+    """
+    Return the timeout to use for a wait, learned from its past durations.
+
+    Falls back to WAIT_TIME until the wait has succeeded at least once.
+    """
+    with _history_lock:
+        durations = _load_history().get(key)
+    if not durations:
+        return WAIT_TIME
+    return min(WAIT_TIME_MAX, max(WAIT_TIME_MIN, max(durations) * WAIT_TIMEOUT_FACTOR))
+
+
+def wait_until_all(driver, selector, condition="present", arg=None, key=None, timeout=None):
+    """
+    Wait until every element matching a CSS selector satisfies a condition.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        selector (str): CSS selector of the target elements.
+        condition (str): 'present' or 'text_contains'.
+        arg (str): Argument of the condition (e.g. the text to look for).
+        key (str): Name under which durations are remembered for adaptive timeouts.
+        timeout (float): Seconds to wait; defaults to the adaptive timeout for `key`.
+
+    Returns:
+        float: Seconds the wait took.
+
+    Raises:
+        TimeoutException: If the condition did not hold in time.
+    """
+    key = key or f"{condition}:{selector}"
+    timeout = timeout or adaptive_timeout(key)
+    driver.set_script_timeout(timeout + 5)
+
+    start = time.perf_counter()
+    with tracing.span(key, "wait"):
+        satisfied = driver.execute_async_script(WAIT_SCRIPT, selector, condition, arg, int(timeout * 1000))
+    elapsed = time.perf_counter() - start
+
+    if satisfied:
+        record_wait(key, elapsed)
+    elif timeout < WAIT_TIME:
+        # A wait cut short by a learned timeout gets WAIT_TIME again next run; a wait that
+        # never succeeds must not push its timeout up to WAIT_TIME_MAX
+        record_wait(key, WAIT_TIME / WAIT_TIMEOUT_FACTOR)
+    if not satisfied:
+        raise TimeoutException(f"'{selector}' did not satisfy '{condition}' within {timeout:.1f} seconds.")
+    return elapsed